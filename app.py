@@ -1,22 +1,43 @@
 import os
 import csv
 import pandas as pd
+import numpy as np
 import re
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, send_file, redirect, url_for, flash, jsonify
-from werkzeug.utils import secure_filename
+from flask import Flask, render_template, request, send_file, redirect, url_for, flash, jsonify, Response, stream_with_context, session, Request, abort, g
+from werkzeug.utils import secure_filename, safe_join, send_file as send_file_from_proxy
 from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
 from openpyxl.utils import get_column_letter
 import tempfile
 import shutil
 import codecs
 import logging
 import time
+import hashlib
+import json
+import threading
+import uuid
+import sqlite3
+import zipfile
+import urllib.parse
+import io
+import itertools
+import mmap
+import multiprocessing
+from collections import namedtuple, deque, OrderedDict
+from array import array
+from functools import lru_cache
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from copy import copy
 
 # Set up logging
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+# LOG_LEVEL=DEBUG brings back the per-row debug lines, which are costly on large exports
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper(), format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
@@ -24,13 +45,59 @@ app.secret_key = "employee_log_extractor_secret_key"
 
 UPLOAD_FOLDER = os.path.join(tempfile.gettempdir(), 'employee_log_extractor')
 OUTPUT_FOLDER = os.path.join(UPLOAD_FOLDER, 'output')
+INDEX_FOLDER = os.path.join(UPLOAD_FOLDER, 'index')
+ARTIFACT_FOLDER = os.path.join(UPLOAD_FOLDER, 'artifacts')
+COLUMNAR_FOLDER = os.path.join(UPLOAD_FOLDER, 'columnar')
+WORKSPACE_FOLDER = os.path.join(UPLOAD_FOLDER, 'workspaces')
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+os.makedirs(INDEX_FOLDER, exist_ok=True)
+os.makedirs(ARTIFACT_FOLDER, exist_ok=True)
+os.makedirs(COLUMNAR_FOLDER, exist_ok=True)
+os.makedirs(WORKSPACE_FOLDER, exist_ok=True)
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['OUTPUT_FOLDER'] = OUTPUT_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
+app.config['INDEX_FOLDER'] = INDEX_FOLDER
+app.config['ARTIFACT_FOLDER'] = ARTIFACT_FOLDER
+app.config['ARTIFACT_CACHE_MAX_BYTES'] = 512 * 1024 * 1024
+app.config['COLUMNAR_FOLDER'] = COLUMNAR_FOLDER  # None disables the columnar cache
+app.config['COLUMNAR_BUILD_BATCH_BLOCKS'] = 500
+app.config['COLUMNAR_CACHE_SIZE'] = 16  # Files whose columnar caches stay memory-mapped
+app.config['ATTENDANCE_DB'] = None  # Path of the optional SQLite attendance store, e.g. os.path.join(UPLOAD_FOLDER, 'attendance.db'); used instead of the columnar cache
+app.config['ATTENDANCE_INSERT_BATCH_ROWS'] = 5000
+app.config['ATTENDANCE_SHARED_HISTORY'] = False  # Let /api/attendance answer from every session's stored files, not just the caller's
+app.config['WORKSPACE_FOLDER'] = WORKSPACE_FOLDER
+app.config['WORKSPACE_TTL_SECONDS'] = 6 * 60 * 60
+app.config['WORKSPACE_QUOTA_BYTES'] = 2 * 1024 * 1024 * 1024
+app.config['JANITOR_INTERVAL_SECONDS'] = 5 * 60
+app.config['MAX_CONTENT_LENGTH'] = 256 * 1024 * 1024
 app.config['ALLOWED_EXTENSIONS'] = {'csv'}
+app.config['ENCODING_SAMPLE_BYTES'] = 64 * 1024
+app.config['ENCODING_CACHE_SIZE'] = 4096
+app.config['FILE_HASH_CACHE_SIZE'] = 4096
+app.config['BLOCK_INDEX_CACHE_SIZE'] = 256
+app.config['WORKER_PROCESSES'] = min(16, os.cpu_count() or 1)
+app.config['RENDER_PARALLEL_MIN_EMPLOYEES'] = 16
+app.config['INGEST_PARALLEL_MIN_BYTES'] = 4 * 1024 * 1024
+app.config['JOB_WORKERS'] = 2
+app.config['JOB_TTL_SECONDS'] = 60 * 60
+app.config['JOB_EVENT_BUFFER'] = 500
+app.config['JOB_EVENT_LOG_MAX_BYTES'] = 1024 * 1024  # Past this a job's events file is rewritten with its last JOB_EVENT_BUFFER events
+app.config['LOG_RESULTS_MAX'] = 10000  # Log lines kept per extraction, the earliest are dropped first
+app.config['JOB_EVENT_KEEPALIVE_SECONDS'] = 15
+app.config['JOB_STATE_INTERVAL_SECONDS'] = 1
+app.config['JOB_EVENT_POLL_SECONDS'] = 0.5
+app.config['JOB_STALE_SECONDS'] = 15 * 60  # Must exceed JANITOR_INTERVAL_SECONDS, which refreshes live jobs' state files
+app.config['BUNDLE_CHUNK_BYTES'] = 256 * 1024
+app.config['REPORT_MAX_DAYS'] = 366  # Longest date range a report may span
+app.config['RESULTS_PAGE_SIZE'] = 100
+app.config['RESULTS_PAGE_MAX'] = 1000
+app.config['EMPLOYEE_PAGE_SIZE'] = 100
+app.config['EMPLOYEE_PAGE_MAX'] = 1000
+app.config['USE_X_SENDFILE'] = False  # Let a proxy with X-Sendfile support (Apache, lighttpd) send the reports
+app.config['X_ACCEL_REDIRECT_PREFIX'] = None  # URI of an nginx internal location aliased to UPLOAD_FOLDER, e.g. '/protected/'
+app.config['METRIC_BUCKETS'] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
 
 # List of departments
 DEPARTMENTS = [
@@ -45,89 +112,959 @@ DEPARTMENTS = [
     "COMMUNITY MEDICINE", "DENTISTRY", "DERMATOLOGY"
 ]
 
+# Worker processes
+#
+# CPU-heavy stages (file indexing, report rendering) fan out over one shared
+# process pool, created on first use and sized by WORKER_PROCESSES. Workers are
+# started by a forkserver: forking the threaded server itself could copy a lock held
+# by another thread into a child that then waits on it forever.
+WORKER_POOL = None
+worker_pool_lock = threading.Lock()
+
+def get_worker_pool():
+    global WORKER_POOL
+    with worker_pool_lock:
+        if WORKER_POOL is None:
+            WORKER_POOL = ProcessPoolExecutor(max_workers=app.config['WORKER_PROCESSES'],
+                                              mp_context=multiprocessing.get_context('forkserver'))
+        return WORKER_POOL
+
+def reset_worker_pool():
+    global WORKER_POOL
+    with worker_pool_lock:
+        WORKER_POOL = None
+
+# Metrics
+#
+# Counters and histograms kept in process memory and served by /metrics in the
+# Prometheus text format: HTTP requests, bytes ingested, cache lookups, jobs, and the
+# time each extraction spends per stage. Stage timings of a job are also returned
+# with its status.
+METRIC_HELP = {
+    'extractor_http_requests_total': ('counter', "HTTP requests by endpoint, method and status."),
+    'extractor_http_request_seconds': ('histogram', "HTTP request handling time by endpoint."),
+    'extractor_stage_seconds': ('histogram', "Time an extraction spent in each stage."),
+    'extractor_ingested_bytes_total': ('counter', "Bytes of CSV files uploaded."),
+    'extractor_ingested_files_total': ('counter', "CSV files uploaded."),
+    'extractor_cache_lookups_total': ('counter', "Cache lookups by cache and result."),
+    'extractor_jobs_total': ('counter', "Finished extraction jobs by status."),
+    'extractor_employees_rendered_total': ('counter', "Employee reports rendered (not served from the artifact cache)."),
+}
+# Counters without labels start at zero, so they are exported before the first event
+METRIC_VALUES = {(name, ()): 0 for name in ('extractor_ingested_bytes_total', 'extractor_ingested_files_total',
+                                             'extractor_employees_rendered_total')}
+metrics_lock = threading.Lock()
+
+def metric_labels(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def count_metric(name, amount=1, **labels):
+    key = (name, metric_labels(labels))
+    with metrics_lock:
+        METRIC_VALUES[key] = METRIC_VALUES.get(key, 0) + amount
+
+def observe_metric(name, seconds, **labels):
+    key = (name, metric_labels(labels))
+    buckets = app.config['METRIC_BUCKETS']
+    with metrics_lock:
+        histogram = METRIC_VALUES.get(key)
+        if histogram is None:
+            histogram = METRIC_VALUES[key] = {'buckets': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+        for position, bound in enumerate(buckets):
+            if seconds <= bound:
+                histogram['buckets'][position] += 1
+        histogram['sum'] += seconds
+        histogram['count'] += 1
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_metric(name, labels, value):
+    if labels:
+        pairs = ','.join(f'{key}="{escape_label(label)}"' for key, label in labels)
+        name = f"{name}{{{pairs}}}"
+    return f"{name} {value!r}" if isinstance(value, float) else f"{name} {value}"
+
+def render_metrics():
+    """Every metric in the Prometheus text exposition format (version 0.0.4)."""
+    with metrics_lock:
+        values = {key: (dict(value, buckets=list(value['buckets'])) if isinstance(value, dict) else value)
+                  for key, value in METRIC_VALUES.items()}
+    with jobs_lock:
+        job_states = [job['status'] for job in JOBS.values()]
+    lines = []
+    for name, (kind, help_text) in METRIC_HELP.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for (metric, labels), value in sorted(values.items()):
+            if metric != name:
+                continue
+            if kind != 'histogram':
+                lines.append(format_metric(name, labels, value))
+                continue
+            for bound, count in zip(app.config['METRIC_BUCKETS'], value['buckets']):
+                lines.append(format_metric(f"{name}_bucket", labels + (('le', str(bound)),), count))
+            lines.append(format_metric(f"{name}_bucket", labels + (('le', '+Inf'),), value['count']))
+            lines.append(format_metric(f"{name}_sum", labels, value['sum']))
+            lines.append(format_metric(f"{name}_count", labels, value['count']))
+    
+    lookups = {}
+    for (metric, labels), value in values.items():
+        if metric == 'extractor_cache_lookups_total':
+            labels = dict(labels)
+            lookups.setdefault(labels['cache'], {})[labels['result']] = value
+    lines.append("# HELP extractor_cache_hit_ratio Share of cache lookups that were hits.")
+    lines.append("# TYPE extractor_cache_hit_ratio gauge")
+    for cache, results in sorted(lookups.items()):
+        total = sum(results.values())
+        lines.append(format_metric('extractor_cache_hit_ratio', (('cache', cache),), results.get('hit', 0) / total))
+    lines.append("# HELP extractor_jobs Extraction jobs by current status.")
+    lines.append("# TYPE extractor_jobs gauge")
+    for status in ('queued', 'running'):
+        lines.append(format_metric('extractor_jobs', (('status', status),), job_states.count(status)))
+    return '\n'.join(lines) + '\n'
+
+class StageTimings(dict):
+    """Seconds spent per extraction stage, summed over every time a stage is entered."""
+    def add(self, name, seconds):
+        self[name] = self.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def observe(self):
+        for name, seconds in self.items():
+            observe_metric('extractor_stage_seconds', seconds, stage=name)
+
+    def rounded(self):
+        return {name: round(seconds, 4) for name, seconds in dict(self).items()}
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
-def format_datetime(value):
-    if not value or not isinstance(value, str):
-        return "", ""
-    try:
-        dt = datetime.strptime(value.strip(), "%Y-%m-%d %H:%M:%S")
-        return dt.date().strftime("%B %d, %Y"), dt.time().strftime("%H:%M:%S")
-    except Exception as e:
-        logger.warning(f"Failed to parse datetime '{value}': {e}")
-        return "", ""
+# Bounded caches
+#
+# The in-memory caches below are keyed by content hash or file path and would grow
+# with every upload of a long-running server, so each keeps at most the number of
+# entries given by its config key, evicting the least recently used one first.
+class LRUCache(OrderedDict):
+    """Thread-safe dict holding at most app.config[size_key] entries, least recently used evicted first."""
+    def __init__(self, size_key):
+        super().__init__()
+        self.size_key = size_key
+        self.lock = threading.Lock()
 
-def time_to_seconds(time_str):
-    if not time_str or not re.match(r'^\d{2}:\d{2}:\d{2}$', time_str):
-        return 0
-    h, m, s = map(int, time_str.split(':'))
-    return h * 3600 + m * 60 + s
+    def get(self, key, default=None):
+        with self.lock:
+            if key not in self:
+                return default
+            self.move_to_end(key)
+            return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            while len(self) > app.config[self.size_key]:
+                self.popitem(last=False)
+
+    def setdefault(self, key, default=None):
+        value = self.get(key)
+        if value is None:
+            self[key] = value = default
+        return value
+
+
+# Encoding detection
+#
+# AEBAS exports are ASCII-compatible, so the encoding is sniffed from the BOM and a
+# bounded sample from the head and tail of the file instead of decoding the whole
+# file once per candidate encoding. Results are cached per content hash. A stray
+# cp1252 byte between the samples is not turned into U+FFFD: text is decoded with
+# the LEGACY_ERRORS handler, which decodes whatever the sniffed codec rejects as cp1252.
+ENCODING_CACHE = LRUCache('ENCODING_CACHE_SIZE')
+LEGACY_ERRORS = 'aebas-legacy'
 
-def time_to_excel_format(time_str):
-    if not time_str or time_str.strip() == "":
-        return ""
+def decode_legacy(error):
+    """Codec error handler decoding the rejected bytes as cp1252, or latin1 where cp1252 leaves a byte undefined."""
+    if not isinstance(error, UnicodeDecodeError):
+        raise error
+    text = ''.join(bytes([byte]).decode('cp1252', errors='ignore') or chr(byte)
+                   for byte in error.object[error.start:error.end])
+    return text, error.end
+
+codecs.register_error(LEGACY_ERRORS, decode_legacy)
+
+def sniff_encoding(head, tail=b'', truncated=False):
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
     try:
-        if re.match(r'^\d{2}:\d{2}:\d{2}$', time_str):
-            return time_str
-        dt = datetime.strptime(time_str.strip(), "%H:%M:%S")
-        return dt.strftime("%H:%M:%S")
-    except Exception as e:
-        logger.warning(f"Failed to format time '{time_str}': {e}")
-        return ""
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=not truncated)
+        # The tail sample may start in the middle of a multi-byte character
+        codecs.getincrementaldecoder('utf-8')().decode(tail.lstrip(bytes(range(0x80, 0xc0))), final=True)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    try:
+        head.decode('cp1252')
+        tail.decode('cp1252')
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'latin1'
+
+def detect_file_encoding(file_path, file_hash=None):
+    if file_hash is None:
+        file_hash = file_content_hash(file_path)
+    encoding = ENCODING_CACHE.get(file_hash)
+    if encoding:
+        return encoding
+
+    sample_size = app.config['ENCODING_SAMPLE_BYTES']
+    with open(file_path, 'rb') as f:
+        head = f.read(sample_size)
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        tail = b''
+        if size > sample_size:
+            f.seek(max(size - sample_size, sample_size))
+            tail = f.read()
+    encoding = sniff_encoding(head, tail, truncated=size > sample_size)
+    logger.debug(f"Detected {encoding} for {file_path}")
+    ENCODING_CACHE[file_hash] = encoding
+    return encoding
 
 def read_csv_safely(file_path):
-    encodings = ['utf-8', 'utf-8-sig', 'latin1', 'iso-8859-1', 'cp1252']
-    start_time = time.time()
-    timeout = 30
+    encoding = detect_file_encoding(file_path)
+    with open(file_path, 'r', encoding=encoding, errors=LEGACY_ERRORS, newline='') as f:
+        data = list(csv.reader(f))
+    logger.debug(f"Successfully read {file_path} with {encoding}")
+    return data, encoding
+
+MONTH_NUMBERS = {'January': 1, 'February': 2, 'March': 3, 'April': 4,
+                 'May': 5, 'June': 6, 'July': 7, 'August': 8,
+                 'September': 9, 'October': 10, 'November': 11, 'December': 12}
+MONTH_PATTERN = re.compile(r'([a-z]+)\s+\d+,\s+(\d{4})', re.IGNORECASE)
+
+# Employee block index
+#
+# Every uploaded AEBAS export is indexed once per content hash. The index records
+# where each employee's block (Att-ID header row, column header row and day rows)
+# starts and ends, together with the encoding and the month found in the file,
+# so the upload and extraction routes never have to reparse the same file. The
+# days each block covers (first and last date ordinal of its rows) and the months of
+# the whole file are recorded too, so date range requests skip whatever lies outside.
+INDEX_VERSION = 6
+BLOCK_INDEX_CACHE = LRUCache('BLOCK_INDEX_CACHE_SIZE')
+FILE_HASH_CACHE = LRUCache('FILE_HASH_CACHE_SIZE')
+index_lock = threading.Lock()
+
+def file_content_hash(file_path):
+    stat = os.stat(file_path)
+    cached = FILE_HASH_CACHE.get(file_path)
+    if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+        return cached[2]
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    file_hash = digest.hexdigest()
+    FILE_HASH_CACHE[file_path] = (stat.st_size, stat.st_mtime_ns, file_hash)
+    return file_hash
+
+def normalize_name(name):
+    return ' '.join(name.split()).lower()
+
+def parse_employee_header(header_text):
+    id_match = re.search(r'Att-ID:(\d+)', header_text, re.IGNORECASE)
+    employee_id = id_match.group(1) if id_match else ""
+
+    name_match = re.search(r'^([^A-Z]*?)(?:\s+Att-ID|\s+Emp)', header_text, re.IGNORECASE)
+    employee_name = name_match.group(1).strip() if name_match else ""
+    if not employee_name:
+        name_match = re.search(r'^(.*?)\s*Att-ID', header_text, re.IGNORECASE)
+        employee_name = name_match.group(1).strip() if name_match else ""
+    if not employee_name:
+        employee_name = header_text.split("Att-ID")[0].strip() if "Att-ID" in header_text else ""
+    return employee_name, employee_id
+
+def detect_month(row_text):
+    """Return (month, year) for rows like "1 January 1, 2025 P ...", skipping column headers."""
+    row_text = row_text.lower()
+    if 'date' in row_text:
+        return None
+    date_match = MONTH_PATTERN.search(row_text)
+    if date_match:
+        month_num = MONTH_NUMBERS.get(date_match.group(1).capitalize())
+        if month_num:
+            return month_num, int(date_match.group(2))
+    return None
+
+EmployeeBlock = namedtuple('EmployeeBlock', ['employee_header', 'column_header', 'rows', 'span'])
+
+def iter_employee_blocks(f, encoding):
+    """Lazily yield an EmployeeBlock for every Att-ID header read from the binary file handle f.
+
+    Only the block being parsed is held in memory, so memory stays flat whatever the file size.
+    span is (row_start, row_end, byte_start, byte_end) relative to where f was positioned.
+    """
+    offset = 0
+    row_number = -1
+    current = None
+    for row_number, line in enumerate(f):
+        row = next(csv.reader([line.decode(encoding, errors=LEGACY_ERRORS)]), [])
+        is_header = "att-id:" in ' '.join(row).lower()
+        
+        if current is not None:
+            if current[1] is None:
+                current[1] = row
+            elif not any(cell.strip() for cell in row) or is_header:
+                employee_header, column_header, rows, row_start, byte_start = current
+                yield EmployeeBlock(employee_header, column_header, rows, (row_start, row_number, byte_start, offset))
+                current = None
+            elif len(row) == len(current[1]):
+                current[2].append(row)
+        
+        if is_header and current is None:
+            current = [row, None, [], row_number, offset]
+        offset += len(line)
     
-    for encoding in encodings:
+    if current is not None:
+        employee_header, column_header, rows, row_start, byte_start = current
+        yield EmployeeBlock(employee_header, column_header or [], rows, (row_start, row_number + 1, byte_start, offset))
+
+ATT_ID_PATTERN = re.compile(rb'att-id:', re.IGNORECASE)
+
+def locate_att_id_headers(mm):
+    """Return the byte offset of every line holding an Att-ID header, found by raw byte search."""
+    offsets = []
+    for match in ATT_ID_PATTERN.finditer(mm):
+        line_start = mm.rfind(b'\n', 0, match.start()) + 1
+        if not offsets or offsets[-1] != line_start:
+            offsets.append(line_start)
+    return offsets
+
+def parse_block_at(mm, block, encoding):
+    """Decode and parse only the bytes of one indexed block."""
+    return next(iter_employee_blocks(io.BytesIO(mm[block['byte_start']:block['byte_end']]), encoding), None)
+
+def block_entry(header_line, encoding, row_start, row_end, byte_start, byte_end):
+    header_row = next(csv.reader([header_line.decode(encoding, errors=LEGACY_ERRORS)]), [])
+    header_text = ' '.join(header_row)
+    name, employee_id = parse_employee_header(header_text)
+    return {
+        'name': name,
+        'id': employee_id,
+        'header': header_text,
+        'row_start': row_start,
+        'row_end': row_end,
+        'byte_start': byte_start,
+        'byte_end': byte_end,
+    }
+
+def detect_blocks_month(mm, blocks, encoding):
+    """The month comes from the first dated row, normally in the very first block."""
+    for block in blocks:
+        employee_block = parse_block_at(mm, block, encoding)
+        if employee_block is None:
+            continue
+        for row in [employee_block.employee_header, employee_block.column_header] + employee_block.rows:
+            month = detect_month(' '.join(row))
+            if month:
+                return month
+    return None
+
+DAY_PATTERN = re.compile(rb'([a-z]+)\s+(\d{1,2}),\s+(\d{4})', re.IGNORECASE)
+
+def detect_blocks_days(mm, blocks):
+    """Set every block's 'days' to the [first, last] ordinal of the dates in its rows, None if it has none."""
+    for block in blocks:
+        block['days'] = None
+    if not blocks:
+        return
+    ordinals = {}
+    position = -1
+    # Exports are in ASCII-compatible encodings, so the dates can be found in the raw bytes
+    for match in DAY_PATTERN.finditer(mm, blocks[0]['byte_start']):
+        while position + 1 < len(blocks) and match.start() >= blocks[position + 1]['byte_start']:
+            position += 1
+        text = match.group(0)
+        if text not in ordinals:
+            month = MONTH_NUMBERS.get(match.group(1).decode('ascii').capitalize())
+            try:
+                ordinals[text] = datetime(int(match.group(3)), month, int(match.group(2))).toordinal() if month else None
+            except ValueError:
+                ordinals[text] = None
+        ordinal = ordinals[text]
+        if ordinal is None or match.start() >= blocks[position]['byte_end']:
+            continue
+        days = blocks[position]['days']
+        if days is None:
+            blocks[position]['days'] = [ordinal, ordinal]
+        else:
+            days[0] = min(days[0], ordinal)
+            days[1] = max(days[1], ordinal)
+
+def covered_months(days):
+    """[month, year] of every month from the first to the last day of a [first, last] ordinal range."""
+    first = datetime.fromordinal(days[0])
+    last = datetime.fromordinal(days[1])
+    return [[(first.month - 1 + step) % 12 + 1, first.year + (first.month - 1 + step) // 12]
+            for step in range((last.year - first.year) * 12 + last.month - first.month + 1)]
+
+def days_overlap(days, date_range):
+    return days is not None and days[0] <= date_range[1] and days[1] >= date_range[0]
+
+def assemble_block_index(file_hash, encoding, size, blocks, month):
+    by_id = {}
+    by_name = {}
+    months = set()
+    covered = []
+    for position, block in enumerate(blocks):
+        if block['id']:
+            by_id.setdefault(block['id'], []).append(position)
+        if block['name']:
+            by_name.setdefault(normalize_name(block['name']), []).append(position)
+        if block['days']:
+            covered.append(block['days'])
+            months.update(tuple(covered_month) for covered_month in covered_months(block['days']))
+
+    return {
+        'version': INDEX_VERSION,
+        'hash': file_hash,
+        'encoding': encoding,
+        'month': list(month) if month else None,
+        'days': [min(days[0] for days in covered), max(days[1] for days in covered)] if covered else None,
+        'months': [list(covered_month) for covered_month in sorted(months, key=lambda m: (m[1], m[0]))],
+        'size': size,
+        'blocks': blocks,
+        'by_id': by_id,
+        'by_name': by_name,
+    }
+
+def build_block_index(file_path, file_hash):
+    encoding = detect_file_encoding(file_path, file_hash)
+    blocks = []
+    month = None
+    size = os.path.getsize(file_path)
+    if size:
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            offsets = locate_att_id_headers(mm)
+            row_start = mm[:offsets[0]].count(b'\n') if offsets else 0
+            for position, byte_start in enumerate(offsets):
+                byte_end = offsets[position + 1] if position + 1 < len(offsets) else size
+                line_end = mm.find(b'\n', byte_start, byte_end)
+                header_line = mm[byte_start:line_end if line_end != -1 else byte_end]
+                row_end = row_start + mm[byte_start:byte_end].count(b'\n')
+                if byte_end == size and mm[size - 1:size] != b'\n':
+                    row_end += 1
+                blocks.append(block_entry(header_line, encoding, row_start, row_end, byte_start, byte_end))
+                row_start = row_end
+            month = detect_blocks_month(mm, blocks, encoding)
+            detect_blocks_days(mm, blocks)
+
+    return assemble_block_index(file_hash, encoding, size, blocks, month)
+
+class BlockIndexBuilder:
+    """
+    Build the block index of a file from its bytes as they arrive, hashing them on the way.
+
+    feed() takes the content chunk by chunk; once the whole file has been written to disk,
+    finish() returns the same index build_block_index would have built from it.
+    """
+    def __init__(self):
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.sample_size = app.config['ENCODING_SAMPLE_BYTES']
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.pending = bytearray()
+        self.newlines = 0
+        self.last_byte = b''
+        self.headers = []  # (byte_start, row_start, header_line)
+
+    def feed(self, chunk):
+        if not chunk:
+            return
+        self.digest.update(chunk)
+        if len(self.head) < self.sample_size:
+            self.head += chunk[:self.sample_size - len(self.head)]
+        self.tail += chunk
+        del self.tail[:-self.sample_size]
+        self.last_byte = chunk[-1:]
+        self.pending += chunk
+        line_end = self.pending.rfind(b'\n')
+        if line_end != -1:
+            # Only whole lines are scanned, so a header never straddles two chunks
+            segment = bytes(self.pending[:line_end + 1])
+            del self.pending[:line_end + 1]
+            self.scan(segment, self.size + len(chunk) - len(self.pending) - len(segment))
+        self.size += len(chunk)
+
+    def scan(self, segment, base):
+        position = 0
+        newlines = self.newlines
+        for match in ATT_ID_PATTERN.finditer(segment):
+            line_start = segment.rfind(b'\n', 0, match.start()) + 1
+            if self.headers and self.headers[-1][0] == base + line_start:
+                continue
+            newlines += segment.count(b'\n', position, line_start)
+            position = line_start
+            line_end = segment.find(b'\n', line_start)
+            self.headers.append((base + line_start, newlines, segment[line_start:line_end if line_end != -1 else len(segment)]))
+        self.newlines = newlines + segment.count(b'\n', position)
+
+    def finish(self, file_path):
+        if self.pending:
+            segment = bytes(self.pending)
+            self.pending.clear()
+            self.scan(segment, self.size - len(segment))
+        file_hash = self.digest.hexdigest()
+        truncated = self.size > self.sample_size
+        # The tail detect_file_encoding reads: the last bytes not already in the head sample
+        tail = bytes(self.tail[-min(self.sample_size, self.size - self.sample_size):]) if truncated else b''
+        encoding = ENCODING_CACHE.setdefault(file_hash, sniff_encoding(bytes(self.head), tail, truncated))
+
+        total_rows = self.newlines + (1 if self.last_byte != b'\n' else 0)
+        blocks = []
+        for position, (byte_start, row_start, header_line) in enumerate(self.headers):
+            if position + 1 < len(self.headers):
+                byte_end, row_end = self.headers[position + 1][:2]
+            else:
+                byte_end, row_end = self.size, total_rows
+            blocks.append(block_entry(header_line, encoding, row_start, row_end, byte_start, byte_end))
+
+        month = None
+        if blocks:
+            with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                month = detect_blocks_month(mm, blocks, encoding)
+                detect_blocks_days(mm, blocks)
+
+        stat = os.stat(file_path)
+        FILE_HASH_CACHE[file_path] = (stat.st_size, stat.st_mtime_ns, file_hash)
+        return assemble_block_index(file_hash, encoding, self.size, blocks, month)
+
+def load_block_index(file_hash):
+    """Return the cached index for file_hash from memory or disk, or None."""
+    index = BLOCK_INDEX_CACHE.get(file_hash)
+    if index is not None:
+        count_metric('extractor_cache_lookups_total', cache='block_index', result='hit')
+        return index
+
+    index_path = os.path.join(app.config['INDEX_FOLDER'], f"{file_hash}.json")
+    if os.path.exists(index_path):
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('version') != INDEX_VERSION:
+                index = None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable block index {index_path}: {e}")
+            index = None
+        if index is not None:
+            with index_lock:
+                BLOCK_INDEX_CACHE[file_hash] = index
+    count_metric('extractor_cache_lookups_total', cache='block_index', result='miss' if index is None else 'hit')
+    return index
+
+def store_block_index(index):
+    with index_lock:
+        BLOCK_INDEX_CACHE[index['hash']] = index
+    index_path = os.path.join(app.config['INDEX_FOLDER'], f"{index['hash']}.json")
+    try:
+        tmp_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+    except Exception as e:
+        logger.warning(f"Could not persist block index {index['hash']}: {e}")
+
+def get_block_indexes(file_paths):
+    """
+    Return the block index of every file, in file_paths order (None for files that failed).
+
+    Files whose content has not been indexed yet are indexed in parallel, each in its own
+    worker process, when there are several of them and enough bytes to be worth it.
+    """
+    def hash_file(file_path):
         try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                reader = csv.reader(f)
-                data = list(reader)
-                logger.debug(f"Successfully read {file_path} with {encoding}")
-                return data, encoding
-        except UnicodeDecodeError:
-            if time.time() - start_time > timeout:
-                logger.error(f"Timeout while reading {file_path}")
-                raise TimeoutError("CSV reading timed out")
+            return file_content_hash(file_path)
+        except Exception as e:
+            logger.error(f"Error hashing {file_path}: {e}")
+            return None
+
+    # hashlib releases the GIL on large buffers, so threads are enough for hashing
+    if len(file_paths) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(file_paths), app.config['WORKER_PROCESSES'] + 1)) as executor:
+            file_hashes = list(executor.map(hash_file, file_paths))
+    else:
+        file_hashes = [hash_file(file_path) for file_path in file_paths]
+
+    indexes = [None] * len(file_paths)
+    pending = []
+    for position, (file_path, file_hash) in enumerate(zip(file_paths, file_hashes)):
+        if file_hash is None:
             continue
-    logger.error(f"Unable to decode {file_path} with any encoding")
-    raise UnicodeDecodeError("Unable to decode the file with any of the attempted encodings", "", 0, 0, "")
+        indexes[position] = load_block_index(file_hash)
+        if indexes[position] is None:
+            pending.append((position, file_path, file_hash))
+
+    pending_bytes = sum(os.path.getsize(file_path) for _, file_path, _ in pending)
+    parallel = app.config['WORKER_PROCESSES'] > 1 and len(pending) > 1 and \
+               pending_bytes >= app.config['INGEST_PARALLEL_MIN_BYTES']
+    if parallel:
+        try:
+            pool = get_worker_pool()
+            futures = [(position, file_path, pool.submit(build_block_index, file_path, file_hash))
+                       for position, file_path, file_hash in pending]
+            for position, file_path, future in futures:
+                try:
+                    indexes[position] = future.result()
+                    store_block_index(indexes[position])
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error indexing {file_path}: {e}")
+            return indexes
+        except BrokenProcessPool as e:
+            logger.error(f"Worker pool failed, indexing in-process: {e}")
+            reset_worker_pool()
+
+    for position, file_path, file_hash in pending:
+        if indexes[position] is not None:
+            continue
+        try:
+            logger.info(f"Building block index for {file_path}")
+            indexes[position] = build_block_index(file_path, file_hash)
+            store_block_index(indexes[position])
+        except Exception as e:
+            logger.error(f"Error indexing {file_path}: {e}")
+    return indexes
+
+def describe_files(file_paths):
+    """Per-file stats (size, encoding, employee blocks, months) taken from the block indexes."""
+    stats = []
+    for file_path, index in zip(file_paths, get_block_indexes(file_paths)):
+        if index is None:
+            continue
+        stats.append({
+            'file': os.path.basename(file_path),
+            'size': index['size'],
+            'encoding': index['encoding'],
+            'employees': len(index['blocks']),
+            'month': index['month'],
+            'months': index['months'],
+        })
+    return stats
+
+def find_employee_block(index, identifier, search_by):
+    """Locate the block for identifier: exact Att-ID/name first, then the old substring match on headers."""
+    if search_by == 'name':
+        positions = index['by_name'].get(normalize_name(identifier))
+        search_pattern = identifier.lower()
+    else:
+        positions = index['by_id'].get(identifier.strip())
+        search_pattern = f"att-id:{identifier.lower()}"
+    if positions:
+        return index['blocks'][positions[0]]
+    for block in index['blocks']:
+        if search_pattern in block['header'].lower():
+            return block
+    return None
+
+def read_employee_blocks(file_path, index, blocks):
+    """Decode the requested employee blocks of one file in a single pass, in file order.
+
+    Yields (block, header_row, column_header, data_rows) for each block.
+    """
+    if not blocks:
+        return
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for block in sorted(blocks, key=lambda b: b['byte_start']):
+            employee_block = parse_block_at(mm, block, index['encoding'])
+            if employee_block is None:
+                continue
+            yield block, employee_block.employee_header, employee_block.column_header, employee_block.rows
+
+# Attendance store
+#
+# Optional SQLite backend, enabled by setting ATTENDANCE_DB. Every parsed employee block
+# is loaded once per file content hash, its day rows indexed on (att_id, date), so
+# extraction reads an employee's rows with an index seek instead of decoding the CSV.
+# /api/attendance answers from the files in the caller's own workspace; with
+# ATTENDANCE_SHARED_HISTORY set it answers from every file ever stored, by any session,
+# so months uploaded earlier stay queryable after their files are gone. When enabled,
+# the store takes the place of the columnar cache.
+ATTENDANCE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    hash TEXT PRIMARY KEY, encoding TEXT, month INTEGER, year INTEGER, blocks INTEGER, loaded REAL
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    file_hash TEXT, byte_start INTEGER, att_id TEXT, name TEXT, name_key TEXT,
+    header_row TEXT, column_header TEXT,
+    PRIMARY KEY (file_hash, byte_start)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS attendance (
+    file_hash TEXT, byte_start INTEGER, seq INTEGER, att_id TEXT, date TEXT, cells TEXT,
+    PRIMARY KEY (file_hash, byte_start, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS attendance_att_id_date ON attendance (att_id, date);
+CREATE INDEX IF NOT EXISTS blocks_name ON blocks (name_key);
+"""
+store_local = threading.local()
+
+def get_attendance_db():
+    """This thread's connection to the attendance store, or None when it is disabled."""
+    path = app.config['ATTENDANCE_DB']
+    if not path:
+        return None
+    conn = getattr(store_local, 'conn', None)
+    if conn is None or store_local.path != path:
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.executescript(ATTENDANCE_SCHEMA)
+        store_local.conn = conn
+        store_local.path = path
+    return conn
+
+def iso_date(text):
+    try:
+        return datetime.strptime(text.strip(), '%B %d, %Y').date().isoformat()
+    except ValueError:
+        return None
+
+def stored_block_rows(file_path, index):
+    """Yield (block row, attendance rows) for each employee block of an indexed file."""
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for block in index['blocks']:
+            employee_block = parse_block_at(mm, block, index['encoding'])
+            if employee_block is None:
+                continue
+            columns = [h.strip().lower() for h in employee_block.column_header]
+            date_column = columns.index('date') if 'date' in columns else None
+            block_row = (index['hash'], block['byte_start'], block['id'], block['name'], normalize_name(block['name']),
+                         json.dumps(employee_block.employee_header), json.dumps(employee_block.column_header))
+            yield block_row, [
+                (index['hash'], block['byte_start'], seq, block['id'],
+                 iso_date(row[date_column]) if date_column is not None else None, json.dumps(row))
+                for seq, row in enumerate(employee_block.rows)]
+
+def store_file_blocks(file_path, index):
+    """
+    Load every employee block of an indexed file into the store, once per content hash.
+    Blocks are parsed while inserting and written ATTENDANCE_INSERT_BATCH_ROWS rows at a
+    time, so only one batch of a large file is held in memory.
+    """
+    conn = get_attendance_db()
+    if conn is None or not index['blocks']:
+        return
+    if conn.execute('SELECT 1 FROM files WHERE hash = ?', (index['hash'],)).fetchone():
+        return
+    batch_size = app.config['ATTENDANCE_INSERT_BATCH_ROWS']
+    block_count = row_count = 0
+    block_rows = []
+    attendance_rows = []
+
+    def flush():
+        conn.executemany('INSERT INTO blocks VALUES (?, ?, ?, ?, ?, ?, ?)', block_rows)
+        conn.executemany('INSERT INTO attendance VALUES (?, ?, ?, ?, ?, ?)', attendance_rows)
+        block_rows.clear()
+        attendance_rows.clear()
+
+    month, year = index['month'] or (None, None)
+    with conn:
+        # BEGIN IMMEDIATE so that two workers loading the same file do it only once
+        conn.execute('BEGIN IMMEDIATE')
+        if conn.execute('SELECT 1 FROM files WHERE hash = ?', (index['hash'],)).fetchone():
+            return
+        for block_row, rows in stored_block_rows(file_path, index):
+            block_rows.append(block_row)
+            attendance_rows.extend(rows)
+            block_count += 1
+            row_count += len(rows)
+            if len(attendance_rows) >= batch_size:
+                flush()
+        flush()
+        conn.execute('INSERT INTO files VALUES (?, ?, ?, ?, ?, ?)',
+                     (index['hash'], index['encoding'], month, year, block_count, time.time()))
+    logger.info(f"Stored {block_count} blocks, {row_count} rows of {file_path}")
+
+def read_stored_blocks(index, blocks):
+    """Like read_employee_blocks, but reading the rows from the attendance store."""
+    conn = get_attendance_db()
+    for block in sorted(blocks, key=lambda b: b['byte_start']):
+        stored = conn.execute('SELECT header_row, column_header FROM blocks WHERE file_hash = ? AND byte_start = ?',
+                              (index['hash'], block['byte_start'])).fetchone()
+        if stored is None:
+            continue
+        rows = [json.loads(cells) for cells, in conn.execute(
+            'SELECT cells FROM attendance WHERE file_hash = ? AND byte_start = ? ORDER BY seq',
+            (index['hash'], block['byte_start']))]
+        yield block, json.loads(stored[0]), json.loads(stored[1]), rows
+
+def query_attendance(identifier, search_by='id', start=None, end=None, file_hashes=None):
+    """
+    Day rows of one employee across every stored file, or only the files with the given
+    content hashes, optionally limited to ISO dates start..end.
+    Returns [(date, column_header, cells)] sorted by date.
+    """
+    conn = get_attendance_db()
+    if conn is None or file_hashes == []:
+        return []
+    file_filter = ''
+    file_params = []
+    if file_hashes is not None:
+        file_hashes = sorted(set(file_hashes))
+        file_filter = f" AND file_hash IN ({', '.join('?' * len(file_hashes))})"
+        file_params = file_hashes
+    if search_by == 'name':
+        att_ids = [att_id for att_id, in conn.execute(
+            'SELECT DISTINCT att_id FROM blocks WHERE name_key = ?' + file_filter,
+            [normalize_name(identifier), *file_params])]
+    else:
+        att_ids = [identifier.strip()]
+    results = []
+    for att_id in att_ids:
+        query = 'SELECT a.date, b.column_header, a.cells FROM attendance a JOIN blocks b ' \
+                'ON a.file_hash = b.file_hash AND a.byte_start = b.byte_start WHERE a.att_id = ?' \
+                + file_filter.replace('file_hash', 'a.file_hash')
+        params = [att_id, *file_params]
+        if start:
+            query += ' AND a.date >= ?'
+            params.append(start)
+        if end:
+            query += ' AND a.date <= ?'
+            params.append(end)
+        results.extend((date, json.loads(column_header), json.loads(cells))
+                       for date, column_header, cells in conn.execute(query, params))
+    results.sort(key=lambda row: row[0] or '')
+    return results
+
+def read_blocks(file_path, index, blocks):
+    """Read the given blocks from the attendance store when it is enabled, else the columnar cache or the file."""
+    if get_attendance_db() is not None:
+        store_file_blocks(file_path, index)
+        return read_stored_blocks(index, blocks)
+    if app.config['COLUMNAR_FOLDER']:
+        return read_columnar_blocks(file_path, index, blocks)
+    return read_employee_blocks(file_path, index, blocks)
+
+class LogResults(deque):
+    """
+    The log_results list, also handing every line to a callback as soon as it is added.
+
+    Only the last LOG_RESULTS_MAX lines are kept; omitted counts the dropped ones and
+    failed tells whether an error line was ever added.
+    """
+    def __init__(self, callback=None):
+        super().__init__(maxlen=app.config['LOG_RESULTS_MAX'])
+        self.callback = callback
+        self.omitted = 0
+        self.failed = False
+
+    def append(self, message):
+        if len(self) == self.maxlen:
+            self.omitted += 1
+        if message.startswith('[❌]'):
+            self.failed = True
+        super().append(message)
+        if self.callback:
+            self.callback(message)
+
+    def lines(self):
+        """The kept lines as a list, after a note on how many earlier ones were dropped."""
+        note = [f"[…] {self.omitted} earlier log lines omitted"] if self.omitted else []
+        return note + list(self)
+
+def collect_employee_blocks(file_paths, identifiers, search_by, log_results, date_range=None):
+    """Resolve every identifier against each file with one pass per file.
+
+    With identifiers None every employee block of every file is collected, keyed by
+    Att-ID and ordered like the roster. With a (first, last) ordinal date_range, files
+    and blocks whose days all fall outside it are skipped without being read.
+    Returns ({identifier: [(file_path, header_row, column_header, data_rows), ...]}, (month, year) or None,
+    {identifier: name}), the names taken from the index block first found for each identifier.
+    """
+    all_employees = identifiers is None
+    found = {} if all_employees else {identifier: [] for identifier in identifiers}
+    names = {}
+    month = None
+    for file_path, index in zip(file_paths, get_block_indexes(file_paths)):
+        logger.debug(f"Scanning {file_path} for {len(found)} identifiers")
+        try:
+            if index is None:
+                raise ValueError("file could not be indexed")
+            if date_range and not days_overlap(index['days'], date_range):
+                log_results.append(f"[📅] Skipped {os.path.basename(file_path)}, it has no days in the requested range")
+                continue
+            if month is None and index['month']:
+                month = tuple(index['month'])
+            
+            wanted = {}
+            if all_employees:
+                log_results.append(f"🔍 Scanning {os.path.basename(file_path)} for all {len(index['by_id'])} employee(s)...")
+                log_results.append(f"  Using encoding: {index['encoding']}")
+                for employee_id, positions in index['by_id'].items():
+                    block = index['blocks'][positions[0]]
+                    wanted[block['byte_start']] = (block, [employee_id])
+                    found.setdefault(employee_id, [])
+                    names.setdefault(employee_id, block['name'])
+                unidentified = sum(1 for block in index['blocks'] if not block['id'])
+                if unidentified:
+                    log_results.append(f"[!] Skipped {unidentified} block(s) without an Att-ID in {os.path.basename(file_path)}")
+            else:
+                log_results.append(f"🔍 Scanning {os.path.basename(file_path)} for {len(found)} employee(s)...")
+                log_results.append(f"  Using encoding: {index['encoding']}")
+                for identifier in found:
+                    block = find_employee_block(index, identifier, search_by)
+                    if block is None:
+                        log_results.append(f"[!] No entry found for '{identifier}' in {os.path.basename(file_path)}")
+                    else:
+                        wanted.setdefault(block['byte_start'], (block, []))[1].append(identifier)
+                        names.setdefault(identifier, block['name'])
+            
+            blocks = [block for block, _ in wanted.values()
+                      if not date_range or days_overlap(block['days'], date_range)]
+            for block, header_row, raw_header, data_rows in read_blocks(file_path, index, blocks):
+                for identifier in wanted[block['byte_start']][1]:
+                    found[identifier].append((file_path, header_row, raw_header, data_rows))
+        except Exception as e:
+            logger.error(f"Error processing {file_path}: {e}")
+            log_results.append(f"[❌] Error processing {os.path.basename(file_path)}: {str(e)}")
+    if all_employees:
+        found = dict(sorted(found.items(), key=lambda item: names[item[0]] or item[0]))
+    return found, month, names
 
 def extract_employees_from_csv(file_paths):
     employees = []
-    for file_path in file_paths:
+    seen_names = set()
+    seen_ids = set()
+    # Files are indexed in parallel; rosters are merged afterwards in upload order
+    for file_path, index in zip(file_paths, get_block_indexes(file_paths)):
         logger.info(f"Processing employee extraction for {file_path}")
         try:
-            reader, _ = read_csv_safely(file_path)
-            for row in reader:
-                row_text = ' '.join(row)
-                if "att-id:" in row_text.lower():
-                    header_text = row_text
-                    id_match = re.search(r'Att-ID:(\d+)', header_text, re.IGNORECASE)
-                    employee_id = id_match.group(1) if id_match else ""
-                    
-                    name_match = re.search(r'^([^A-Z]*?)(?:\s+Att-ID|\s+Emp)', header_text, re.IGNORECASE)
-                    employee_name = name_match.group(1).strip() if name_match else ""
-                    if not employee_name:
-                        name_match = re.search(r'^(.*?)\s*Att-ID', header_text, re.IGNORECASE)
-                        employee_name = name_match.group(1).strip() if name_match else ""
-                    if not employee_name:
-                        employee_name = header_text.split("Att-ID")[0].strip() if "Att-ID" in header_text else ""
-                    
-                    if employee_name or employee_id:
-                        is_duplicate = any((employee_name and emp['name'] == employee_name) or \
-                                          (employee_id and emp['id'] == employee_id) for emp in employees)
-                        if not is_duplicate:
-                            employees.append({
-                                'name': employee_name,
-                                'id': employee_id,
-                                'display': f"{employee_name} (ID: {employee_id})" if employee_name and employee_id else \
-                                          employee_name if employee_name else f"ID: {employee_id}"
-                            })
-                            logger.debug(f"Added employee: {employee_name} (ID: {employee_id})")
+            if index is None:
+                raise ValueError("file could not be indexed")
+            for block in index['blocks']:
+                employee_name, employee_id = block['name'], block['id']
+                if employee_name or employee_id:
+                    is_duplicate = (employee_name and employee_name in seen_names) or \
+                                   (employee_id and employee_id in seen_ids)
+                    if not is_duplicate:
+                        employees.append({
+                            'name': employee_name,
+                            'id': employee_id,
+                            'display': f"{employee_name} (ID: {employee_id})" if employee_name and employee_id else \
+                                      employee_name if employee_name else f"ID: {employee_id}"
+                        })
+                        seen_names.add(employee_name)
+                        seen_ids.add(employee_id)
+                        logger.debug(f"Added employee: {employee_name} (ID: {employee_id})")
         except Exception as e:
             logger.error(f"Error processing {file_path} for employees: {e}")
     
@@ -136,345 +1073,542 @@ def extract_employees_from_csv(file_paths):
     return employees
 
 
-def extract_employee_logs(file_paths, identifiers, search_by, output_format='xlsx', department=None):
+# Employee search
+#
+# The roster of a workspace's uploads is indexed once, at upload time: every 1 to 3
+# character n-gram of an employee's normalized name and Att-ID maps to the roster
+# positions containing it. A query intersects the posting lists of its n-grams (its
+# trigrams once it is longer than that), confirms the substring match on the few
+# candidates left and ranks exact, prefix and word-prefix matches first.
+EMPLOYEE_INDEXES = {}
+employee_index_lock = threading.Lock()
+
+class EmployeeIndex:
+    def __init__(self, employees):
+        self.employees = employees
+        self.keys = [(normalize_name(employee['name']), employee['id'].lower()) for employee in employees]
+        self.postings = {}
+        for position, keys in enumerate(self.keys):
+            grams = set()
+            for key in keys:
+                for size in (1, 2, 3):
+                    grams.update(key[i:i + size] for i in range(len(key) - size + 1))
+            for gram in grams:
+                self.postings.setdefault(gram, array('I')).append(position)
+
+    def rank(self, position, query):
+        name, employee_id = self.keys[position]
+        if query == name or query == employee_id:
+            return 0
+        if name.startswith(query) or employee_id.startswith(query):
+            return 1
+        if f" {query}" in name:
+            return 2
+        return 3
+
+    def search(self, query):
+        """Roster positions of the employees whose name or Att-ID contains the query, best matches first."""
+        query = normalize_name(query)
+        if not query:
+            return range(len(self.employees))
+        size = min(len(query), 3)
+        grams = {query[i:i + size] for i in range(len(query) - size + 1)}
+        postings = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+        candidates = set(postings[0])
+        for positions in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(positions)
+        matches = [position for position in candidates if any(query in key for key in self.keys[position])]
+        matches.sort(key=lambda position: (self.rank(position, query), position))
+        return matches
+
+def uploaded_csv_files(workspace):
+    return [os.path.join(workspace['uploads'], f)
+            for f in os.listdir(workspace['uploads'])
+            if f.endswith('.csv')]
+
+def get_employee_index(workspace):
+    """The search index over the roster of the workspace's uploads, rebuilt when they change."""
+    file_paths = uploaded_csv_files(workspace)
+    signature = []
+    for file_path in file_paths:
+        stat = os.stat(file_path)
+        signature.append((file_path, stat.st_size, stat.st_mtime_ns))
+    signature = tuple(sorted(signature))
+    with employee_index_lock:
+        cached = EMPLOYEE_INDEXES.get(workspace['id'])
+    if cached and cached[0] == signature:
+        return cached[1]
+    index = EmployeeIndex(extract_employees_from_csv(file_paths))
+    with employee_index_lock:
+        EMPLOYEE_INDEXES[workspace['id']] = (signature, index)
+    return index
+
+
+# Report frame engine
+#
+# All selected employees' rows are parsed into one long frame and reindexed against a
+# shared month calendar, then split into compact per-employee EmployeeAttendance grids
+# that the report writers consume directly.
+REPORT_COLUMNS = {
+    'date': 'Date',
+    'status': 'Status',
+    'in_time_val': 'In Time',
+    'out_time_val': 'Out Time',
+    'in_time_short_fall': 'In Time Short Fall',
+    'out_time_short_fall': 'Out Time Short Fall',
+    'duration': 'Duration'
+}
+TIME_COLUMNS = ['in_time_val', 'out_time_val', 'in_time_short_fall', 'out_time_short_fall', 'duration']
+STATUS_CODES = ['P', 'A', 'H', 'L']
+
+def time_strings_to_seconds(values):
+    """Seconds for HH:MM:SS cells, NaN for blank or invalid ones."""
+    values = values.fillna('').astype(str)
+    parts = values.str.extract(r'^(\d{2}):(\d{2}):(\d{2})$').astype(float)
+    seconds = parts[0] * 3600 + parts[1] * 60 + parts[2]
+    stripped = values.str.strip()
+    fallback = seconds.isna() & (stripped != '')
+    if fallback.any():
+        parsed = pd.to_datetime(stripped[fallback], format='%H:%M:%S', errors='coerce')
+        seconds[fallback] = parsed.dt.hour * 3600 + parsed.dt.minute * 60 + parsed.dt.second
+    return seconds
+
+REPORT_HEADER = list(REPORT_COLUMNS.values())
+NO_TIME = -1
+
+@lru_cache(maxsize=None)
+def report_date_label(ordinal):
+    return datetime.fromordinal(ordinal).strftime('%B %d, %Y')
+
+@lru_cache(maxsize=4096)
+def report_time_label(seconds):
+    if seconds == NO_TIME:
+        return ''
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+class EmployeeAttendance:
     """
-    Extract employee attendance logs and generate reports in various formats.
-    Fixed version that ensures complete date ranges and proper status handling.
+    One employee's report grid as parallel compact columns: day ordinals, status codes
+    (positions in STATUS_CODES) and, for each of TIME_COLUMNS, seconds since midnight
+    (NO_TIME where blank). The report writers turn it into text one row at a time.
+    """
+    __slots__ = ['days', 'status'] + TIME_COLUMNS
+
+    def __init__(self, days, status, times):
+        self.days = days
+        self.status = status
+        for col in TIME_COLUMNS:
+            setattr(self, col, times[col])
+
+    def __len__(self):
+        return len(self.days)
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def rows(self):
+        """Yield the report rows as text, in REPORT_HEADER order."""
+        times = [getattr(self, col) for col in TIME_COLUMNS]
+        for position, (day, status) in enumerate(zip(self.days, self.status)):
+            yield (report_date_label(day), STATUS_CODES[status]) + \
+                  tuple(report_time_label(column[position]) for column in times)
+
+def parse_attendance_rows(blocks):
     """
-    from datetime import datetime, timedelta
-    import pandas as pd
-    import os
-    import re
-    from openpyxl import Workbook
-    from openpyxl.utils import get_column_letter
-    from openpyxl.utils.dataframe import dataframe_to_rows
-    from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
-    import logging
-
-    logger = logging.getLogger(__name__)
+    Parse raw day rows in one vectorized pass.
+
+    blocks holds (key, clean_header, data_rows) tuples. Returns a frame with the block key,
+    the day (from In Time), the status code (position in STATUS_CODES, -1 if unknown) and
+    the time columns in seconds.
+    """
+    source_columns = ['in_time', 'out_time', 'status', 'in_time_short_fall', 'out_time_short_fall', 'duration']
+    columns = {name: [] for name in ['block'] + source_columns}
+    for key, clean_header, data_rows in blocks:
+        positions = {name: i for i, name in enumerate(clean_header)}
+        transposed = list(zip(*data_rows))
+        columns['block'].extend([key] * len(data_rows))
+        for name in source_columns:
+            if name in positions:
+                columns[name].extend(transposed[positions[name]])
+            else:
+                columns[name].extend([None] * len(data_rows))
+    rows = pd.DataFrame(columns)
     
-    log_results = []
-    wb = Workbook()
-    wb.remove(wb.active)
-    any_data_found = False
-    output_files = {'xlsx': None, 'csv': [], 'html': []}
-    display_names = {}
-    min_date = None
-    max_date = None
+    in_dt = pd.to_datetime(rows['in_time'].fillna('').astype(str).str.strip(), format='%Y-%m-%d %H:%M:%S', errors='coerce')
+    out_dt = pd.to_datetime(rows['out_time'].fillna('').astype(str).str.strip(), format='%Y-%m-%d %H:%M:%S', errors='coerce')
+    dates = in_dt.dt.normalize()
+    return pd.DataFrame({
+        'block': rows['block'].astype('int64'),
+        'date': dates,
+        'status': pd.Categorical(rows['status'], categories=STATUS_CODES).codes,
+        'in_time_val': (in_dt - dates).dt.total_seconds(),
+        'out_time_val': (out_dt - out_dt.dt.normalize()).dt.total_seconds(),
+        'in_time_short_fall': time_strings_to_seconds(rows['in_time_short_fall']),
+        'out_time_short_fall': time_strings_to_seconds(rows['out_time_short_fall']),
+        'duration': time_strings_to_seconds(rows['duration']),
+    })
+
+def build_employee_attendance(report_blocks, employee_count, report_start, report_end, timings=None):
+    """
+    Build the month grid of every employee in one vectorized pass.
+
+    report_blocks holds (employee, clean_header, data_rows) tuples, employee being the
+    position of the employee in the selection; data_rows are raw CSV rows or ColumnarRows
+    from the columnar cache. Returns one EmployeeAttendance per employee. The parse and
+    frame_build stages are timed into timings, if given.
+    """
+    timings = timings if timings is not None else StageTimings()
+    raw_blocks = []
+    cached_blocks = []
+    for seq, (employee, clean_header, data_rows) in enumerate(report_blocks):
+        if isinstance(data_rows, ColumnarRows):
+            cached_blocks.append((seq, data_rows))
+        else:
+            raw_blocks.append((seq, clean_header, data_rows))
+    with timings.stage('parse'):
+        parts = columnar_frames(cached_blocks)
+        if raw_blocks or not parts:
+            parts.append(parse_attendance_rows(raw_blocks))
+    parsed = time.perf_counter()
+    frame = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+    if len(parts) > 1:
+        # Keep the selection and file order, the first occurrence of a day is the one reported
+        frame = frame.sort_values('block', kind='stable')
+    employees = np.array([employee for employee, _, _ in report_blocks], dtype='int64')
+    frame['employee'] = employees[frame['block'].to_numpy()] if len(frame) else frame['block']
     
-    # Find the month in the uploaded CSV files first
-    csv_month = None
-    csv_year = None
+    # Only include rows from the report range, first occurrence of each day wins
+    calendar = pd.date_range(report_start, report_end, freq='D')
+    frame = frame[(frame['date'] >= calendar[0]) & (frame['date'] <= calendar[-1])]
+    frame = frame.drop_duplicates(subset=['employee', 'date'], keep='first')
     
-    # First scan to determine the month from the data
-    for file_path in file_paths:
-        try:
-            reader, encoding = read_csv_safely(file_path)
-            for row in reader:
-                row_text = ' '.join(row).lower()
-                if 'date' in row_text:
+    grid = pd.MultiIndex.from_product([range(employee_count), calendar], names=['employee', 'date'])
+    frame = frame.set_index(['employee', 'date']).reindex(grid)
+    
+    days = len(calendar)
+    ordinals = array('i', [day.toordinal() for day in calendar])
+    # Unrecognised or missing statuses fall outside the categories and become absent
+    status = frame['status'].fillna(-1).to_numpy().astype('int8')
+    status[status < 0] = STATUS_CODES.index('A')
+    times = {col: frame[col].fillna(NO_TIME).to_numpy().astype('int32') for col in TIME_COLUMNS}
+    attendance = []
+    for employee in range(employee_count):
+        grid = slice(employee * days, (employee + 1) * days)
+        attendance.append(EmployeeAttendance(
+            ordinals,
+            array('b', status[grid].tobytes()),
+            {col: array('i', values[grid].tobytes()) for col, values in times.items()},
+        ))
+    timings.add('frame_build', time.perf_counter() - parsed)
+    return attendance
+
+
+# Columnar cache
+#
+# After the first parse of a file, its day rows are kept per content hash as typed
+# NumPy arrays (day, status code and the time columns in seconds), rows of
+# block k at block_offsets[k]:block_offsets[k + 1], plus a small JSON string table.
+# Each array is its own .npy file so it can be memory-mapped; reports for a cached
+# file then cost a memory map and a slice instead of CSV decoding and date parsing.
+# Only the per-row arrays are mapped (each map holds a file descriptor), the small
+# per-block ones are read into memory, and at most COLUMNAR_CACHE_SIZE files stay
+# mapped. The janitor removes the caches of files no workspace holds anymore.
+COLUMNAR_VERSION = 1
+COLUMNAR_BLOCK_ARRAYS = ['block_offsets', 'block_parsed', 'block_header']
+COLUMNAR_ARRAYS = COLUMNAR_BLOCK_ARRAYS + ['day', 'status'] + TIME_COLUMNS
+NO_DAY = np.iinfo(np.int32).min
+COLUMNAR_CACHE = LRUCache('COLUMNAR_CACHE_SIZE')
+
+class ColumnarRows:
+    """The day rows of one block, as a slice of a file's columnar cache."""
+    def __init__(self, columns, start, stop):
+        self.columns = columns
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+def columnar_frames(blocks):
+    """
+    Gather (key, ColumnarRows) blocks into frames shaped like parse_attendance_rows output,
+    taking the rows of all blocks from the same file with a single fancy index.
+    """
+    by_file = {}
+    for key, rows in blocks:
+        by_file.setdefault(id(rows.columns), (rows.columns, []))[1].append((key, rows))
+    frames = []
+    for columns, file_blocks in by_file.values():
+        lengths = np.array([len(rows) for _, rows in file_blocks], dtype='int64')
+        starts = np.array([rows.start for _, rows in file_blocks], dtype='int64')
+        # Row numbers of every block, one contiguous run per block
+        take = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths - starts, lengths)
+        days = np.asarray(columns['day'][take], dtype='int64')
+        missing = days == NO_DAY
+        dates = np.where(missing, 0, days).astype('datetime64[D]').astype('datetime64[ns]')
+        dates[missing] = np.datetime64('NaT')
+        frame = pd.DataFrame({
+            'block': np.repeat(np.array([key for key, _ in file_blocks], dtype='int64'), lengths),
+            'date': dates,
+            'status': np.asarray(columns['status'][take]),
+        })
+        for col in TIME_COLUMNS:
+            frame[col] = np.asarray(columns[col][take], dtype='float64')
+        frames.append(frame)
+    return frames
+
+def columnar_row_arrays(frame):
+    """The per-row arrays of a parse_attendance_rows frame, in their cached types."""
+    days = frame['date'].to_numpy().astype('datetime64[D]').astype('int64')
+    arrays = {
+        'day': np.where(frame['date'].isna().to_numpy(), NO_DAY, days).astype('int32'),
+        'status': frame['status'].to_numpy().astype('int8'),
+    }
+    for col in TIME_COLUMNS:
+        arrays[col] = frame[col].to_numpy().astype('float32')
+    return arrays
+
+def build_columnar_cache(file_path, index):
+    """
+    Parse every block of an indexed file once and write its columnar cache.
+
+    Blocks are parsed COLUMNAR_BUILD_BATCH_BLOCKS at a time and only their typed arrays
+    are kept, so memory use stays bounded by the batch rather than the file.
+    """
+    blocks = index['blocks']
+    column_headers = []
+    block_header = np.full(len(blocks), -1, dtype='int32')
+    block_parsed = np.zeros(len(blocks), dtype='int8')
+    counts = np.zeros(len(blocks), dtype='int64')
+    parts = []
+    
+    def add_batch(raw_blocks):
+        frame = parse_attendance_rows(raw_blocks)
+        counts[:] += np.bincount(frame['block'].to_numpy(), minlength=len(blocks))
+        parts.append(columnar_row_arrays(frame))
+    
+    if blocks:
+        batch_size = app.config['COLUMNAR_BUILD_BATCH_BLOCKS']
+        raw_blocks = []
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for position, block in enumerate(blocks):
+                employee_block = parse_block_at(mm, block, index['encoding'])
+                if employee_block is None:
                     continue
-                # Look for date patterns like "March 15, 2025"
-                date_match = re.search(r'([a-z]+)\s+\d+,\s+(\d{4})', row_text, re.IGNORECASE)
-                if date_match:
-                    month_name = date_match.group(1).capitalize()
-                    year = int(date_match.group(2))
-                    month_num = {'January': 1, 'February': 2, 'March': 3, 'April': 4, 
-                                'May': 5, 'June': 6, 'July': 7, 'August': 8, 
-                                'September': 9, 'October': 10, 'November': 11, 'December': 12}.get(month_name)
-                    if month_num:
-                        csv_month = month_num
-                        csv_year = year
-                        log_results.append(f"[📅] Detected month from CSV: {month_name} {year}")
-                        break
-            if csv_month:
-                break
-        except Exception as e:
-            logger.error(f"Error scanning {file_path} for month: {e}")
+                if employee_block.column_header not in column_headers:
+                    column_headers.append(employee_block.column_header)
+                block_header[position] = column_headers.index(employee_block.column_header)
+                block_parsed[position] = 1
+                clean_header = [h.strip().lower().replace(" ", "_") for h in employee_block.column_header]
+                raw_blocks.append((position, clean_header, employee_block.rows))
+                if len(raw_blocks) >= batch_size:
+                    add_batch(raw_blocks)
+                    raw_blocks = []
+        if raw_blocks:
+            add_batch(raw_blocks)
+    if not parts:
+        add_batch([])
     
-    # If we couldn't determine month from data, use current month as fallback
-    if not csv_month:
-        today = datetime.now()
-        csv_month = today.month
-        csv_year = today.year
-        log_results.append(f"[📅] No month detected in CSV, using current month: {csv_month}/{csv_year}")
+    arrays = {
+        'block_offsets': np.concatenate([[0], np.cumsum(counts)]).astype('int64'),
+        'block_parsed': block_parsed,
+        'block_header': block_header,
+    }
+    for name in parts[0]:
+        arrays[name] = np.concatenate([part[name] for part in parts]) if len(parts) > 1 else parts[0][name]
+    parts.clear()
+    strings = {
+        'version': COLUMNAR_VERSION,
+        'column_headers': column_headers,
+    }
     
-    # Set the date range for the report based on the detected month
-    report_month_start = datetime(csv_year, csv_month, 1)
-    if csv_month == 12:
-        report_month_end = datetime(csv_year + 1, 1, 1) - timedelta(days=1)
-    else:
-        report_month_end = datetime(csv_year, csv_month + 1, 1) - timedelta(days=1)
+    folder = os.path.join(app.config['COLUMNAR_FOLDER'], index['hash'])
+    tmp_folder = tempfile.mkdtemp(prefix='.tmp-', dir=app.config['COLUMNAR_FOLDER'])
+    try:
+        for name, values in arrays.items():
+            np.save(os.path.join(tmp_folder, f"{name}.npy"), values)
+        with open(os.path.join(tmp_folder, 'strings.json'), 'w', encoding='utf-8') as f:
+            json.dump(strings, f)
+        if not os.path.exists(folder):
+            os.rename(tmp_folder, folder)
+    except OSError as e:
+        logger.warning(f"Could not persist columnar cache of {file_path}: {e}")
+    finally:
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+
+def load_columnar_cache(file_hash):
+    """Memory-map the columnar cache of file_hash, or None if there is none."""
+    columns = COLUMNAR_CACHE.get(file_hash)
+    if columns is not None:
+        return columns
+    folder = os.path.join(app.config['COLUMNAR_FOLDER'], file_hash)
+    try:
+        with open(os.path.join(folder, 'strings.json'), 'r', encoding='utf-8') as f:
+            strings = json.load(f)
+        if strings.get('version') != COLUMNAR_VERSION:
+            return None
+        # Evicted maps are closed once the last extraction slicing them lets go
+        columns = {name: np.load(os.path.join(folder, f"{name}.npy"),
+                                 mmap_mode=None if name in COLUMNAR_BLOCK_ARRAYS else 'r')
+                   for name in COLUMNAR_ARRAYS}
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable columnar cache {folder}: {e}")
+        return None
+    columns.update(strings)
+    COLUMNAR_CACHE[file_hash] = columns
+    return columns
+
+def get_columnar_cache(file_path, index):
+    columns = load_columnar_cache(index['hash'])
+    count_metric('extractor_cache_lookups_total', cache='columnar', result='miss' if columns is None else 'hit')
+    if columns is None:
+        logger.info(f"Building columnar cache for {file_path}")
+        build_columnar_cache(file_path, index)
+        columns = load_columnar_cache(index['hash'])
+    return columns
+
+def read_columnar_blocks(file_path, index, blocks):
+    """Like read_employee_blocks, but slicing the rows out of the file's columnar cache."""
+    columns = get_columnar_cache(file_path, index)
+    if columns is None:
+        yield from read_employee_blocks(file_path, index, blocks)
+        return
+    positions = {block['byte_start']: position for position, block in enumerate(index['blocks'])}
+    offsets = columns['block_offsets']
+    for block in sorted(blocks, key=lambda b: b['byte_start']):
+        position = positions[block['byte_start']]
+        if not columns['block_parsed'][position]:
+            continue
+        # The report only needs ' '.join(header_row), which the index already holds
+        yield (block, [block['header']], columns['column_headers'][columns['block_header'][position]],
+               ColumnarRows(columns, int(offsets[position]), int(offsets[position + 1])))
+
+
+# Excel report writer
+#
+# Sheets are streamed through a write-only workbook: cells reference a handful of
+# named styles registered once per workbook, column widths are computed from the
+# data up front and every row is emitted exactly once.
+EXCEL_STATUS_COLORS = {
+    'P': 'C6EFCE',  # Green for Present
+    'A': 'FFC7CE',  # Red for Absent
+    'H': 'FFEB9C',  # Yellow for Half-day
+    'L': 'DDEBF7'   # Light blue for Leave
+}
+TITLE_STYLES = ['report_org', 'report_title', 'report_info']
+
+def add_report_styles(wb):
+    center = Alignment(horizontal="center", vertical="center")
+    body_font = copy(DEFAULT_FONT)
+    thin = Side(style='thin')
+    thin_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    styles = [
+        NamedStyle(name='report_org', font=Font(bold=True, size=16), alignment=center,
+                   fill=PatternFill("solid", fgColor="BDD7EE")),
+        NamedStyle(name='report_title', font=Font(bold=True, size=14), alignment=center,
+                   fill=PatternFill("solid", fgColor="BDD7EE")),
+        NamedStyle(name='report_info', font=Font(bold=True, size=12), alignment=center,
+                   fill=PatternFill("solid", fgColor="E2EFDA")),
+        NamedStyle(name='report_header', font=Font(bold=True), alignment=center, border=thin_border,
+                   fill=PatternFill("solid", fgColor="F4B084")),
+        NamedStyle(name='report_cell', font=body_font, alignment=center, border=thin_border),
+        NamedStyle(name='report_time', font=body_font, alignment=center, border=thin_border, number_format='[hh]:mm:ss'),
+    ]
+    for status, color in EXCEL_STATUS_COLORS.items():
+        styles.append(NamedStyle(name=f'report_status_{status}', font=body_font, alignment=center, border=thin_border,
+                                 fill=PatternFill("solid", fgColor=color)))
+    for style in styles:
+        wb.add_named_style(style)
+
+def report_column_widths(titles, columns, rows):
+    widths = []
+    for col_idx, column in enumerate(columns):
+        max_length = max([len(column)] + [len(row[col_idx]) for row in rows])
+        if col_idx == 0:
+            max_length = max([max_length] + [len(title) for title in titles])
+        widths.append(max_length + 4)
+    return widths
+
+def prepare_report_sheet(titles, attendance):
+    rows = list(attendance.rows())
+    return {
+        'titles': titles,
+        'columns': REPORT_HEADER,
+        'rows': rows,
+        'widths': report_column_widths(titles, REPORT_HEADER, rows),
+    }
+
+def write_report_sheet(wb, sheet_name, sheet):
+    """Append one employee sheet, prepared by prepare_report_sheet, to the write-only workbook wb."""
+    ws = wb.create_sheet(title=sheet_name)
+    for col_idx, width in enumerate(sheet['widths'], start=1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
     
-    for identifier in identifiers:
-        logger.info(f"Processing logs for identifier: {identifier} ({search_by})")
-        all_data_frames = []
-        employee_name = ""
-        employee_id = ""
-        designation = "Senior Resident Ng"  # Default designation
-        sheet_name = f"Report_{identifier[:31]}"  # Default sheet name, truncated to 31 chars
-        
-        for file_path in file_paths:
-            logger.debug(f"Scanning {file_path} for {identifier}")
-            try:
-                reader, encoding = read_csv_safely(file_path)
-                log_results.append(f"🔍 Scanning {os.path.basename(file_path)} for {identifier}...")
-                log_results.append(f"  Using encoding: {encoding}")
-                
-                emp_index = None
-                search_pattern = identifier.lower() if search_by == 'name' else f"att-id:{identifier.lower()}"
-                
-                for idx, row in enumerate(reader):
-                    row_text = ' '.join(row).lower()
-                    if search_pattern in row_text:
-                        emp_index = idx
-                        header_text = ' '.join(row)
-                        if search_by == 'name':
-                            employee_name = identifier
-                            id_match = re.search(r'Att-ID:(\d+)', header_text, re.IGNORECASE)
-                            employee_id = id_match.group(1) if id_match else ""
-                        else:
-                            employee_id = identifier
-                            name_match = re.search(r'^([^A-Z]*?)\s+Att-ID', header_text, re.IGNORECASE)
-                            employee_name = name_match.group(1).strip() if name_match else ""
-                        logger.debug(f"Found employee: {employee_name} (ID: {employee_id})")
-                        break
-                
-                if emp_index is not None:
-                    raw_header = reader[emp_index + 1] if emp_index + 1 < len(reader) else []
-                    clean_header = [h.strip().lower().replace(" ", "_") for h in raw_header]
-                    data_rows = []
-                    
-                    for row in reader[emp_index + 2:]:
-                        if not row or not any(cell.strip() for cell in row):
-                            break
-                        if row and len(row) > 0 and search_pattern not in ' '.join(row).lower() and "att-id" in ' '.join(row).lower():
-                            break
-                        if row and len(row) == len(raw_header):
-                            data_rows.append(row)
-                    
-                    if data_rows:
-                        df = pd.DataFrame(data_rows, columns=clean_header)
-                        
-                        if 'in_time' in df.columns and 'out_time' in df.columns:
-                            df['date'], df['in_time_val'] = zip(*df['in_time'].map(format_datetime))
-                            df['out_time_val'] = df['out_time'].map(lambda x: format_datetime(x)[1])
-                            df.drop(['in_time', 'out_time'], axis=1, inplace=True)
-                            
-                            time_columns = ['in_time_val', 'out_time_val', 'in_time_short_fall', 'out_time_short_fall', 'duration']
-                            for col in time_columns:
-                                if col in df.columns:
-                                    df[col] = df[col].apply(time_to_excel_format)
-                            
-                            cols = ['date', 'status', 'in_time_val', 'out_time_val', 
-                                    'in_time_short_fall', 'out_time_short_fall', 'duration']
-                            existing_cols = [col for col in cols if col in df.columns]
-                            df = df[existing_cols]
-                            
-                            df['date_dt'] = pd.to_datetime(df['date'], format='%B %d, %Y', errors='coerce')
-                            
-                            # Only include rows from the correct month
-                            df = df[(df['date_dt'] >= report_month_start) & (df['date_dt'] <= report_month_end)]
-                            
-                            all_data_frames.append(df)
-                            any_data_found = True
-                            logger.debug(f"Extracted {len(data_rows)} rows for {identifier} in {file_path}")
-                        else:
-                            log_results.append(f"[⚠️] Missing In/Out Time columns in {file_path}.")
-                    else:
-                        log_results.append(f"[!] Found {search_by} but no data rows in {file_path}")
-                else:
-                    log_results.append(f"[!] No entry found for '{identifier}' in {file_path}")
-            except Exception as e:
-                logger.error(f"Error processing {file_path} for {identifier}: {e}")
-                log_results.append(f"[❌] Error processing {os.path.basename(file_path)}: {str(e)}")
-        
-        # Generate complete date range for the report (only for the detected month)
-        date_range = [report_month_start + timedelta(days=x) for x in range((report_month_end - report_month_start).days + 1)]
-        date_range_df = pd.DataFrame({
-            'date': [d.strftime('%B %d, %Y') for d in date_range],
-            'date_dt': date_range
-        })
-        
-        if all_data_frames:
-            try:
-                # Combine all data frames for this employee
-                combined_df = pd.concat(all_data_frames, ignore_index=True)
-                combined_df['date_dt'] = pd.to_datetime(combined_df['date'], format='%B %d, %Y', errors='coerce')
-                combined_df = combined_df.sort_values('date_dt').drop_duplicates(subset=['date']).dropna(subset=['date_dt'])
-                
-                # Merge with complete date range
-                merged_df = date_range_df.merge(combined_df, on=['date', 'date_dt'], how='left')
-                
-                # CRITICAL FIX: Ensure status values are preserved exactly as they are
-                # Create a new status column and preserve P, A, H, L values
-                if 'status' not in merged_df.columns:
-                    merged_df['status'] = 'A'  # Default to absent
-                else:
-                    # Fill NaN values with 'A'
-                    merged_df['status'] = merged_df['status'].fillna('A')
-                    
-                    # Make sure status values are one of P, A, H, L
-                    for idx, status in enumerate(merged_df['status']):
-                        if status not in ['P', 'A', 'H', 'L']:
-                            merged_df.at[idx, 'status'] = 'A'  # Default to absent if unrecognized
-                
-                # Fill missing values for time columns
-                for col in ['in_time_val', 'out_time_val', 'in_time_short_fall', 'out_time_short_fall', 'duration']:
-                    if col in merged_df.columns:
-                        merged_df[col] = merged_df[col].fillna('')
-                    else:
-                        merged_df[col] = [''] * len(merged_df)
-                
-                # Use the merged dataframe with complete date range
-                combined_df = merged_df
-                
-            except Exception as e:
-                logger.error(f"Error combining data frames for {identifier}: {e}")
-                log_results.append(f"[❌] Error combining data for {identifier}: {str(e)}")
-                # Create an empty dataframe with full date range if combining fails
-                combined_df = date_range_df.copy()
-                combined_df['status'] = ['A'] * len(combined_df)
-                combined_df['in_time_val'] = [''] * len(combined_df)
-                combined_df['out_time_val'] = [''] * len(combined_df)
-                combined_df['in_time_short_fall'] = [''] * len(combined_df)
-                combined_df['out_time_short_fall'] = [''] * len(combined_df)
-                combined_df['duration'] = [''] * len(combined_df)
-        else:
-            # Create an empty dataframe with full date range if no data found
-            combined_df = date_range_df.copy()
-            combined_df['status'] = ['A'] * len(combined_df)
-            combined_df['in_time_val'] = [''] * len(combined_df)
-            combined_df['out_time_val'] = [''] * len(combined_df)
-            combined_df['in_time_short_fall'] = [''] * len(combined_df)
-            combined_df['out_time_short_fall'] = [''] * len(combined_df)
-            combined_df['duration'] = [''] * len(combined_df)
-            any_data_found = True  # Mark as having data so we generate reports
-        
-        # Final dataframe preparation
-        combined_df = combined_df.drop(columns=['date_dt'], errors='ignore')
-        
-        # Rename columns for the reports
-        column_mapping = {
-            'date': 'Date',
-            'status': 'Status',
-            'in_time_val': 'In Time',
-            'out_time_val': 'Out Time',
-            'in_time_short_fall': 'In Time Short Fall',
-            'out_time_short_fall': 'Out Time Short Fall',
-            'duration': 'Duration'
-        }
-        combined_df = combined_df.rename(columns=column_mapping)
-        
-        # Set up display name and sheet name
-        if employee_name:
-            sheet_name = employee_name[:31]
-        elif employee_id:
-            sheet_name = f"ID_{employee_id[:31]}"
-        display_name = f"{employee_name} Att-ID:{employee_id} Designation:{designation}"
-        
-        # Generate reports in requested format(s)
-        if output_format in ['xlsx', 'all']:
-            ws = wb.create_sheet(title=sheet_name)
-            
-            ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=len(combined_df.columns))
-            org_cell = ws.cell(row=1, column=1)
-            org_cell.value = "DECCAN COLLEGE OF MEDICAL SCIENCES"
-            org_cell.font = Font(bold=True, size=16)
-            org_cell.alignment = Alignment(horizontal="center", vertical="center")
-            org_cell.fill = PatternFill("solid", fgColor="BDD7EE")
-            
-            ws.merge_cells(start_row=2, start_column=1, end_row=2, end_column=len(combined_df.columns))
-            title_cell = ws.cell(row=2, column=1)
-            title_cell.value = f"{department} AEBAS Attendance from {report_month_start.strftime('%B %d, %Y')} to {report_month_end.strftime('%B %d, %Y')}"
-            title_cell.font = Font(bold=True, size=14)
-            title_cell.alignment = Alignment(horizontal="center", vertical="center")
-            title_cell.fill = PatternFill("solid", fgColor="BDD7EE")
-            
-            ws.merge_cells(start_row=3, start_column=1, end_row=3, end_column=len(combined_df.columns))
-            info_cell = ws.cell(row=3, column=1)
-            info_cell.value = display_name
-            info_cell.font = Font(bold=True, size=12)
-            info_cell.alignment = Alignment(horizontal="center", vertical="center")
-            info_cell.fill = PatternFill("solid", fgColor="E2EFDA")
-            
-            for col_idx, header in enumerate(combined_df.columns, start=1):
-                cell = ws.cell(row=4, column=col_idx)
-                cell.value = header
-                cell.font = Font(bold=True)
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-                cell.fill = PatternFill("solid", fgColor="F4B084")
-            
-            # Status colors mapping for Excel
-            status_colors = {
-                'P': 'C6EFCE',  # Green for Present
-                'A': 'FFC7CE',  # Red for Absent
-                'H': 'FFEB9C',  # Yellow for Half-day
-                'L': 'DDEBF7'   # Light blue for Leave
-            }
-            
-            for r_idx, row in enumerate(dataframe_to_rows(combined_df, index=False, header=False), start=5):
-                for c_idx, value in enumerate(row, start=1):
-                    cell = ws.cell(row=r_idx, column=c_idx)
-                    cell.value = value
-                    cell.alignment = Alignment(horizontal="center", vertical="center")
-                    
-                    # Apply color to status column
-                    if c_idx == 2 and value in status_colors:  # Status column
-                        cell.fill = PatternFill("solid", fgColor=status_colors[value])
-                    
-                    if c_idx in [3, 4, 5, 6, 7]:  # Time columns
-                        cell.number_format = '[hh]:mm:ss'
-            
-            thin_border = Border(
-                left=Side(style='thin'), right=Side(style='thin'),
-                top=Side(style='thin'), bottom=Side(style='thin')
-            )
-            
-            for row in ws.iter_rows(min_row=4, max_row=ws.max_row, min_col=1, max_col=ws.max_column):
-                for cell in row:
-                    cell.border = thin_border
-            
-            for col_idx in range(1, ws.max_column + 1):
-                max_length = 0
-                col_letter = get_column_letter(col_idx)
-                for row in ws.iter_rows(min_row=1, max_row=ws.max_row, min_col=col_idx, max_col=col_idx):
-                    for cell in row:
-                        if cell.value:
-                            max_length = max(max_length, len(str(cell.value)))
-                ws.column_dimensions[col_letter].width = max_length + 4
-        
-        if output_format in ['csv', 'all']:
-            csv_filename = f"{sheet_name}_report.csv"
-            csv_path = os.path.join(app.config['OUTPUT_FOLDER'], csv_filename)
-            combined_df.to_csv(csv_path, index=False)
-            output_files['csv'].append({'filename': csv_filename, 'display': display_name})
-        
-        if output_format in ['html', 'all']:
-            html_filename = f"{sheet_name}_report.html"
-            html_path = os.path.join(app.config['OUTPUT_FOLDER'], html_filename)
-            
-            # Formatter for status column to apply color coding
-            def status_formatter(status):
-                status_colors = {
-                    'P': '#6BB635',  # Green for Present
-                    'A': '#FF7575',  # Red for Absent
-                    'H': '#FFCC66',  # Orange for Half-day
-                    'L': '#A2CAED'   # Blue for Leave
-                }
-                
-                color = status_colors.get(status, '#000000')  # Default black if status not recognized
-                return f'<span style="font-weight: bold; color: {color}">{status}</span>'
-            
-            html_table = combined_df.to_html(
-                index=False,
-                classes='data',
-                border=0,
-                escape=False,
-                formatters={'Status': status_formatter}
-            )
-            
-            html_content = f"""
+    def styled(value, style):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+    
+    last_column = get_column_letter(len(sheet['columns']))
+    for row_idx, (title, style) in enumerate(zip(sheet['titles'], TITLE_STYLES), start=1):
+        ws.merged_cells.add(f"A{row_idx}:{last_column}{row_idx}")
+        ws.append([styled(title, style)])
+    ws.append([styled(header, 'report_header') for header in sheet['columns']])
+    
+    # Date, Status (colour coded), then the time columns
+    for values in sheet['rows']:
+        row = [styled(values[0], 'report_cell')]
+        if len(values) > 1:
+            status = values[1]
+            row.append(styled(status, f'report_status_{status}' if status in EXCEL_STATUS_COLORS else 'report_cell'))
+        row.extend(styled(value, 'report_time') for value in values[2:])
+        ws.append(row)
+    return ws
+
+
+# Per-employee report rendering
+#
+# Each employee's CSV and HTML documents and the cell rows of their Excel sheet are
+# produced by render_employee_reports, which fans out over a process pool for larger
+# selections. Only picklable task dicts cross the process boundary.
+HTML_STATUS_COLORS = {
+    'P': '#6BB635',  # Green for Present
+    'A': '#FF7575',  # Red for Absent
+    'H': '#FFCC66',  # Orange for Half-day
+    'L': '#A2CAED'   # Blue for Leave
+}
+
+def html_status_formatter(status):
+    color = HTML_STATUS_COLORS.get(status, '#000000')  # Default black if status not recognized
+    return f'<span style="font-weight: bold; color: {color}">{status}</span>'
+
+def render_html_table(attendance):
+    """The report table, in the markup DataFrame.to_html produced for it."""
+    lines = ['<table class="dataframe data">', '  <thead>', '    <tr style="text-align: right;">']
+    lines.extend(f'      <th>{column}</th>' for column in REPORT_HEADER)
+    lines.extend(['    </tr>', '  </thead>', '  <tbody>'])
+    for row in attendance.rows():
+        lines.append('    <tr>')
+        lines.append(f'      <td>{row[0]}</td>')
+        lines.append(f'      <td>{html_status_formatter(row[1])}</td>')
+        lines.extend(f'      <td>{value}</td>' for value in row[2:])
+        lines.append('    </tr>')
+    lines.extend(['  </tbody>', '</table>'])
+    return '\n'.join(lines)
+
+def render_html_report(attendance, display_name, department, employee_name, employee_id, designation,
+                       report_month_start, report_month_end):
+    html_table = render_html_table(attendance)
+    
+    html_content = f"""
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -570,20 +1704,439 @@ def extract_employee_logs(file_paths, identifiers, search_by, output_format='xls
 </body>
 </html>
 """
-            with open(html_path, 'w', encoding='utf-8') as f:
+    return html_content
+
+def render_employee_reports(task):
+    """Write one employee's CSV/HTML reports and prepare their Excel sheet from a task dict."""
+    started = time.perf_counter()
+    attendance = task['report']
+    sheet_name = task['sheet_name']
+    display_name = task['display_name']
+    formats = task['formats']
+    timings = StageTimings()
+    rendered = {'xlsx': None, 'csv': None, 'html': None}
+    
+    if 'xlsx' in formats:
+        with timings.stage('render_xlsx'):
+            titles = [
+                "DECCAN COLLEGE OF MEDICAL SCIENCES",
+                f"{task['department']} AEBAS Attendance from {task['report_start'].strftime('%B %d, %Y')} to {task['report_end'].strftime('%B %d, %Y')}",
+                display_name,
+            ]
+            rendered['xlsx'] = prepare_report_sheet(titles, attendance)
+    
+    # Output files are written aside and renamed into place, as the previous file
+    # may be a hardlink into the artifact cache
+    if 'csv' in formats:
+        with timings.stage('render_csv'):
+            csv_filename = f"{sheet_name}_report.csv"
+            csv_path = os.path.join(task['output_folder'], csv_filename)
+            tmp_path = f"{csv_path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f, lineterminator=os.linesep)
+                writer.writerow(REPORT_HEADER)
+                writer.writerows(attendance.rows())
+            os.replace(tmp_path, csv_path)
+            rendered['csv'] = {'filename': csv_filename, 'display': display_name}
+    
+    if 'html' in formats:
+        with timings.stage('render_html'):
+            html_filename = f"{sheet_name}_report.html"
+            html_path = os.path.join(task['output_folder'], html_filename)
+            html_content = render_html_report(attendance, display_name, task['department'], task['employee_name'],
+                                              task['employee_id'], task['designation'], task['report_start'], task['report_end'])
+            tmp_path = f"{html_path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 f.write(html_content)
-            output_files['html'].append({'filename': html_filename, 'display': display_name})
+            os.replace(tmp_path, html_path)
+            rendered['html'] = {'filename': html_filename, 'display': display_name}
+    
+    rendered['seconds'] = time.perf_counter() - started
+    rendered['timings'] = timings
+    return rendered
+
+def render_reports(tasks):
+    """Yield the rendering of every task in order, using the process pool when CSV/HTML files are requested for enough employees."""
+    workers = app.config['WORKER_PROCESSES']
+    writes_files = any('csv' in task['formats'] or 'html' in task['formats'] for task in tasks)
+    done = 0
+    if workers > 1 and writes_files and len(tasks) >= app.config['RENDER_PARALLEL_MIN_EMPLOYEES']:
+        try:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            for rendered in get_worker_pool().map(render_employee_reports, tasks, chunksize=chunksize):
+                done += 1
+                yield rendered
+            return
+        except BrokenProcessPool as e:
+            logger.error(f"Worker pool failed, rendering in-process: {e}")
+            reset_worker_pool()
+    for task in tasks[done:]:
+        yield render_employee_reports(task)
+
+
+# Artifact cache
+#
+# Rendered reports are kept under ARTIFACT_FOLDER, content addressed by the hashes of
+# the input files and the normalized request parameters: one entry per employee and
+# output kind (the prepared Excel sheet, the CSV file, the HTML file), plus one per
+# whole request holding its result and output files. Entries are hardlinked (or copied)
+# back into the output folder on a hit and evicted least recently used first once the
+# cache grows past ARTIFACT_CACHE_MAX_BYTES. Prepared sheets hold only strings and
+# numbers and are kept as JSON in the entry's meta.json, never as pickles. The cache's
+# total size is kept as a running count, updated on store and eviction, so a request
+# only walks the folder when the count says it is over the limit; artifact_lock guards
+# that count and the renames that publish or retire an entry, never the file copies.
+ARTIFACT_VERSION = 6
+REPORT_FORMATS = {'xlsx': ['xlsx'], 'csv': ['csv'], 'html': ['html'], 'all': ['xlsx', 'csv', 'html']}
+artifact_lock = threading.Lock()
+ARTIFACT_SIZE = None  # Bytes under ARTIFACT_FOLDER, None until first measured
+
+def artifact_key(*parts):
+    payload = json.dumps([ARTIFACT_VERSION, *parts], default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def link_file(src, dst):
+    """Hardlink src to dst, falling back to a copy, replacing dst if it exists."""
+    tmp_path = f"{dst}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        shutil.copy2(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+def artifact_entry_size(path):
+    """Total size in bytes of the files in one cache entry."""
+    try:
+        return sum(f.stat().st_size for f in os.scandir(path))
+    except OSError:
+        return 0
+
+def scan_artifacts():
+    """Return (last used, size, path) for every cache entry, least recently used first."""
+    entries = []
+    for entry in os.scandir(app.config['ARTIFACT_FOLDER']):
+        if entry.name.startswith('.tmp-') or not entry.is_dir():
+            continue
+        try:
+            used = os.stat(os.path.join(entry.path, 'meta.json')).st_mtime
+        except OSError:
+            used = 0
+        entries.append((used, artifact_entry_size(entry.path), entry.path))
+    entries.sort()
+    return entries
+
+def add_artifact_size(delta):
+    """Adjust the running cache size by delta bytes; the caller holds artifact_lock."""
+    global ARTIFACT_SIZE
+    if ARTIFACT_SIZE is not None:
+        ARTIFACT_SIZE += delta
+
+def load_artifact(key, output_folder):
+    """Return a cached entry's metadata, with its files linked into output_folder, or None on a miss."""
+    entry = os.path.join(app.config['ARTIFACT_FOLDER'], key)
+    meta_path = os.path.join(entry, 'meta.json')
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        for name in meta['files']:
+            link_file(os.path.join(entry, name), os.path.join(output_folder, name))
+        os.utime(meta_path)  # Mark as recently used
+    except (OSError, ValueError, KeyError) as e:
+        # A concurrent eviction shows up here as a missing file and is just a miss
+        if not isinstance(e, FileNotFoundError):
+            logger.warning(f"Ignoring unreadable artifact {key}: {e}")
+        count_metric('extractor_cache_lookups_total', cache='artifact', result='miss')
+        return None
+    count_metric('extractor_cache_lookups_total', cache='artifact', result='hit')
+    return meta
+
+def store_artifact(key, meta, file_paths=(), sheet=None):
+    """Cache meta (plus the given output files and prepared sheet) under key."""
+    entry = os.path.join(app.config['ARTIFACT_FOLDER'], key)
+    if os.path.exists(entry):
+        return
+    tmp_entry = tempfile.mkdtemp(prefix='.tmp-', dir=app.config['ARTIFACT_FOLDER'])
+    try:
+        for path in file_paths:
+            link_file(path, os.path.join(tmp_entry, os.path.basename(path)))
+        meta = dict(meta, files=[os.path.basename(path) for path in file_paths], sheet=sheet)
+        with open(os.path.join(tmp_entry, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        size = artifact_entry_size(tmp_entry)
+        with artifact_lock:
+            if not os.path.exists(entry):
+                os.rename(tmp_entry, entry)
+                add_artifact_size(size)
+    except OSError as e:
+        logger.warning(f"Could not cache artifact {key}: {e}")
+    finally:
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+
+def prune_artifacts():
+    """Evict least recently used entries until the cache fits in ARTIFACT_CACHE_MAX_BYTES."""
+    global ARTIFACT_SIZE
+    limit = app.config['ARTIFACT_CACHE_MAX_BYTES']
+    with artifact_lock:
+        if ARTIFACT_SIZE is not None and ARTIFACT_SIZE <= limit:
+            return
+    # Over the limit, or not yet measured: walk the folder once. This also picks up
+    # entries stored by other worker processes, which the running count cannot see.
+    entries = scan_artifacts()
+    total = sum(size for _, size, _ in entries)
+    evicted = 0
+    retired = []
+    with artifact_lock:
+        while entries and total > limit:
+            used, size, path = entries.pop(0)
+            retired_path = os.path.join(app.config['ARTIFACT_FOLDER'], f".tmp-{uuid.uuid4().hex}")
+            try:
+                os.rename(path, retired_path)
+                retired.append(retired_path)
+            except OSError:
+                pass  # Already evicted by another process
+            total -= size
+            evicted += 1
+        ARTIFACT_SIZE = total
+    for path in retired:
+        shutil.rmtree(path, ignore_errors=True)
+    if evicted:
+        logger.info(f"Evicted {evicted} cached artifacts, {total} bytes remain")
+
+def resolve_date_range(file_paths, start_date, end_date):
+    """Fill an open end of a requested range with the first or last day the files cover."""
+    covered = [index['days'] for index in get_block_indexes(file_paths) if index and index['days']]
+    if start_date is None:
+        start_date = datetime.fromordinal(min(days[0] for days in covered)) if covered else end_date.replace(day=1)
+    if end_date is None:
+        end_date = datetime.fromordinal(max(days[1] for days in covered)) if covered else start_date
+    return start_date, max(start_date, end_date)
+
+def extract_employee_logs(file_paths, identifiers, search_by, output_format='xlsx', department=None, progress_callback=None, log_callback=None, output_folder=None, start_date=None, end_date=None, timings=None):
+    """
+    Extract employee attendance logs and generate reports in various formats.
+    Fixed version that ensures complete date ranges and proper status handling.
+    Reports are written to output_folder, OUTPUT_FOLDER by default. With identifiers None,
+    reports are generated for every employee in the files, looked up by Att-ID.
+    Reports cover the month detected in the files unless start_date and/or end_date are
+    given; an open end defaults to the first or last day found in the files.
+    progress_callback, if given, is called as (completed, total, identifier, display_name, seconds)
+    after each employee's reports are rendered; log_callback, if given, gets every log line as it is added.
+    The seconds spent in each stage are added to timings, a StageTimings, if given.
+    """
+    log_results = LogResults(log_callback)
+    timings = timings if timings is not None else StageTimings()
+    all_employees = identifiers is None
+    if all_employees:
+        search_by = 'id'
+    output_folder = output_folder or app.config['OUTPUT_FOLDER']
+    formats = REPORT_FORMATS.get(output_format, [])
+    file_hashes = [file_content_hash(file_path) for file_path in file_paths]
+    department_key = department or ''
+    date_key = [d.strftime('%Y-%m-%d') if d else None for d in (start_date, end_date)]
+    request_key = artifact_key('request', file_hashes, search_by,
+                               'all' if all_employees else [i.strip() for i in identifiers],
+                               output_format, department_key, date_key)
+    
+    # A repeated request is answered from the artifact cache as a whole
+    cached = load_artifact(request_key, output_folder)
+    if cached:
+        result = cached['result']
+        if all_employees:
+            identifiers = list(result['display_names'])
+        logger.info(f"Serving {len(identifiers)} identifiers from cached artifacts")
+        log_results.omitted = result.get('omitted_logs', 0)
+        for message in result['logs']:
+            log_results.append(message)
+        if progress_callback:
+            for completed, identifier in enumerate(identifiers, start=1):
+                progress_callback(completed, len(identifiers), identifier, result['display_names'].get(identifier, ''), 0.0)
+        min_date = datetime.fromisoformat(result['min_date']) if result['min_date'] else None
+        max_date = datetime.fromisoformat(result['max_date']) if result['max_date'] else None
+        return log_results.lines(), result['output_files'], result['display_names'], min_date, max_date
+    
+    wb = Workbook(write_only=True)
+    add_report_styles(wb)
+    any_data_found = False
+    output_files = {'xlsx': None, 'csv': [], 'html': []}
+    display_names = {}
+    min_date = None
+    max_date = None
+    
+    date_range = None
+    if start_date or end_date:
+        with timings.stage('month_detection'):
+            start_date, end_date = resolve_date_range(file_paths, start_date, end_date)
+            date_range = (start_date.toordinal(), end_date.toordinal())
+        # Every employee gets a row per day of the range, so it is capped
+        if date_range[1] - date_range[0] + 1 > app.config['REPORT_MAX_DAYS']:
+            raise ValueError(f"The report range may span at most {app.config['REPORT_MAX_DAYS']} days")
+    
+    # Resolve every identifier and detect the month with a single pass over each file
+    with timings.stage('decode'):
+        found_blocks, detected_month, block_names = collect_employee_blocks(file_paths, identifiers, search_by, log_results, date_range)
+    if all_employees:
+        identifiers = list(found_blocks)
+        log_results.append(f"[👥] Found {len(identifiers)} employees in the uploaded files")
+    with timings.stage('month_detection'):
+        csv_month = None
+        csv_year = None
+        if date_range:
+            log_results.append(f"[📅] Reporting from {start_date.strftime('%B %d, %Y')} to {end_date.strftime('%B %d, %Y')}")
+        elif detected_month:
+            csv_month, csv_year = detected_month
+            month_name = datetime(csv_year, csv_month, 1).strftime('%B')
+            log_results.append(f"[📅] Detected month from CSV: {month_name} {csv_year}")
+    
+        # If we couldn't determine month from data, use current month as fallback
+        if not csv_month and not date_range:
+            today = datetime.now()
+            csv_month = today.month
+            csv_year = today.year
+            log_results.append(f"[📅] No month detected in CSV, using current month: {csv_month}/{csv_year}")
+    
+        # Set the date range for the report based on the requested range or the detected month
+        if date_range:
+            report_month_start, report_month_end = start_date, end_date
+        else:
+            report_month_start = datetime(csv_year, csv_month, 1)
+            if csv_month == 12:
+                report_month_end = datetime(csv_year + 1, 1, 1) - timedelta(days=1)
+            else:
+                report_month_end = datetime(csv_year, csv_month + 1, 1) - timedelta(days=1)
+    report_key = [report_month_start.strftime('%Y-%m-%d'), report_month_end.strftime('%Y-%m-%d')]
+    
+    # Collect every employee's data rows so all month grids are built in one vectorized pass
+    employees = []
+    report_blocks = []
+    for position, identifier in enumerate(identifiers):
+        logger.info(f"Processing logs for identifier: {identifier} ({search_by})")
+        employee_name = ""
+        employee_id = ""
+        has_data = False
+        
+        for file_path, header_row, raw_header, data_rows in found_blocks[identifier]:
+            try:
+                header_text = ' '.join(header_row)
+                if search_by == 'name':
+                    employee_name = identifier
+                    id_match = re.search(r'Att-ID:(\d+)', header_text, re.IGNORECASE)
+                    employee_id = id_match.group(1) if id_match else ""
+                else:
+                    # Named from the index, as in all-employees mode, so both share cached reports
+                    employee_id = identifier
+                    employee_name = block_names.get(identifier, "")
+                logger.debug(f"Found employee: {employee_name} (ID: {employee_id})")
+                clean_header = [h.strip().lower().replace(" ", "_") for h in raw_header]
+                
+                if data_rows:
+                    if 'in_time' in clean_header and 'out_time' in clean_header:
+                        report_blocks.append((position, clean_header, data_rows))
+                        has_data = True
+                        any_data_found = True
+                        logger.debug(f"Extracted {len(data_rows)} rows for {identifier} in {file_path}")
+                    else:
+                        log_results.append(f"[⚠️] Missing In/Out Time columns in {os.path.basename(file_path)}.")
+                else:
+                    log_results.append(f"[!] Found {search_by} but no data rows in {os.path.basename(file_path)}")
+            except Exception as e:
+                logger.error(f"Error processing {file_path} for {identifier}: {e}")
+                log_results.append(f"[❌] Error processing {os.path.basename(file_path)}: {str(e)}")
+        
+        if not has_data:
+            any_data_found = True  # Mark as having data so we generate reports
+        employees.append((identifier, employee_name, employee_id))
+    
+    try:
+        attendance = build_employee_attendance(report_blocks, len(employees), report_month_start, report_month_end, timings)
+    except Exception as e:
+        logger.error(f"Error building attendance grids: {e}")
+        log_results.append(f"[❌] Error combining data: {str(e)}")
+        # Fall back to empty month grids (all absent) for every employee
+        attendance = build_employee_attendance([], len(employees), report_month_start, report_month_end, timings)
+    
+    tasks = []
+    for position, (identifier, employee_name, employee_id) in enumerate(employees):
+        designation = "Senior Resident Ng"  # Default designation
+        sheet_name = f"Report_{identifier[:31]}"  # Default sheet name, truncated to 31 chars
         
+        # Set up display name and sheet name
+        if employee_name:
+            sheet_name = employee_name[:31]
+        elif employee_id:
+            sheet_name = f"ID_{employee_id[:31]}"
+        display_name = f"{employee_name} Att-ID:{employee_id} Designation:{designation}"
+        
+        tasks.append({
+            'identifier': identifier,
+            'report': attendance[position],
+            'sheet_name': sheet_name,
+            'display_name': display_name,
+            'employee_name': employee_name,
+            'employee_id': employee_id,
+            'designation': designation,
+            'department': department,
+            'report_start': report_month_start,
+            'report_end': report_month_end,
+            'output_format': output_format,
+            'output_folder': output_folder,
+            'cache_key': artifact_key('employee', file_hashes, search_by, identifier.strip(), department_key, report_key),
+        })
         display_names[identifier] = display_name
-        log_results.append(f"[✅] Logs added for {display_name}")
+    
+    # Reuse every report an earlier request already rendered for the same employee
+    cached_reports = []
+    for task in tasks:
+        cached = {}
+        for kind in formats:
+            meta = load_artifact(f"{task['cache_key']}-{kind}", output_folder)
+            if meta:
+                cached[kind] = meta['sheet'] if kind == 'xlsx' else meta['entry']
+        task['formats'] = [kind for kind in formats if kind not in cached]
+        cached_reports.append(cached)
+    
+    # Render the remaining reports (in the process pool for larger selections), then
+    # assemble the workbook from the sheets the workers prepared
+    pending = render_reports([task for task in tasks if task['formats']])
+    for completed, (task, cached) in enumerate(zip(tasks, cached_reports), start=1):
+        if task['formats']:
+            rendered = next(pending)
+            for name, seconds in rendered['timings'].items():
+                timings.add(name, seconds)
+            count_metric('extractor_employees_rendered_total')
+            # A report rendered after an error may be incomplete, so it is not cached
+            if not log_results.failed:
+                with timings.stage('save'):
+                    for kind in task['formats']:
+                        key = f"{task['cache_key']}-{kind}"
+                        if kind == 'xlsx':
+                            store_artifact(key, {}, sheet=rendered['xlsx'])
+                        else:
+                            store_artifact(key, {'entry': rendered[kind]},
+                                           [os.path.join(output_folder, rendered[kind]['filename'])])
+        else:
+            rendered = {'xlsx': None, 'csv': None, 'html': None, 'seconds': 0.0}
+        rendered.update(cached)
+        if rendered['xlsx']:
+            with timings.stage('save'):
+                write_report_sheet(wb, task['sheet_name'], rendered['xlsx'])
+        if rendered['csv']:
+            output_files['csv'].append(rendered['csv'])
+        if rendered['html']:
+            output_files['html'].append(rendered['html'])
+        log_results.append(f"[✅] Logs added for {task['display_name']}")
+        if progress_callback:
+            progress_callback(completed, len(tasks), task['identifier'], task['display_name'], rendered['seconds'])
     
     # Save Excel file if data was found and output format includes xlsx
     if any_data_found and output_format in ['xlsx', 'all']:
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             xlsx_filename = f"Employee_Reports_{timestamp}.xlsx"
-            xlsx_path = os.path.join(app.config['OUTPUT_FOLDER'], xlsx_filename)
-            wb.save(xlsx_path)
+            xlsx_path = os.path.join(output_folder, xlsx_filename)
+            tmp_path = f"{xlsx_path}.{uuid.uuid4().hex}.tmp"
+            with timings.stage('save'):
+                wb.save(tmp_path)
+                os.replace(tmp_path, xlsx_path)
             output_files['xlsx'] = {'filename': xlsx_filename, 'display': 'All Employees'}
             log_results.append(f"✅ Excel report saved: {xlsx_filename}")
         except Exception as e:
@@ -592,18 +2145,746 @@ def extract_employee_logs(file_paths, identifiers, search_by, output_format='xls
     elif not any_data_found:
         log_results.append("❌ No logs found for any selected employees.")
     
+    # Cache the whole result unless something went wrong along the way
+    if not log_results.failed:
+        output_names = [entry['filename'] for entry in output_files['csv'] + output_files['html']]
+        if output_files['xlsx']:
+            output_names.append(output_files['xlsx']['filename'])
+        with timings.stage('save'):
+            store_artifact(request_key, {'result': {
+                'logs': list(log_results),
+                'omitted_logs': log_results.omitted,
+                'output_files': output_files,
+                'display_names': display_names,
+                'min_date': min_date.isoformat() if min_date else None,
+                'max_date': max_date.isoformat() if max_date else None,
+            }}, [os.path.join(output_folder, name) for name in output_names])
+    prune_artifacts()
+    
     logger.info(f"Completed processing for {len(identifiers)} identifiers in {output_format} format")
-    return log_results, output_files, display_names, min_date, max_date
+    return log_results.lines(), output_files, display_names, min_date, max_date
+
+# Workspaces
+#
+# Every browser session gets its own upload and output folders under WORKSPACE_FOLDER,
+# so concurrent users never pick up or overwrite each other's files, and every job
+# writes its reports to a folder of its own under the output folder, so two jobs of
+# one session do not either. A janitor thread removes workspaces idle for longer than
+# WORKSPACE_TTL_SECONDS, then the least recently used ones while all of them together
+# exceed WORKSPACE_QUOTA_BYTES, and drops the persisted block indexes and columnar
+# caches of files no remaining workspace holds.
+WORKSPACE_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+janitor_lock = threading.Lock()
+JANITOR = None
+
+def valid_job_id(job_id):
+    """Job ids are uuid4 hex, like workspace ids."""
+    return bool(WORKSPACE_PATTERN.match(job_id))
+
+def get_workspace():
+    """Return the current session's workspace as {'id', 'root', 'uploads', 'output', 'results'}, creating it if needed."""
+    workspace_id = session.get('workspace')
+    if not workspace_id or not WORKSPACE_PATTERN.match(workspace_id):
+        workspace_id = uuid.uuid4().hex
+        session['workspace'] = workspace_id
+    root = os.path.join(app.config['WORKSPACE_FOLDER'], workspace_id)
+    workspace = {
+        'id': workspace_id,
+        'root': root,
+        'uploads': os.path.join(root, 'uploads'),
+        'output': os.path.join(root, 'output'),
+        'results': os.path.join(root, 'results'),
+    }
+    os.makedirs(workspace['uploads'], exist_ok=True)
+    os.makedirs(workspace['output'], exist_ok=True)
+    os.makedirs(workspace['results'], exist_ok=True)
+    os.utime(root)  # Last use, for the janitor
+    start_janitor()
+    return workspace
+
+def folder_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+def live_file_hashes():
+    """Content hashes of every file uploaded to a workspace that still exists."""
+    hashes = set()
+    for entry in os.scandir(app.config['WORKSPACE_FOLDER']):
+        uploads = os.path.join(entry.path, 'uploads')
+        if not WORKSPACE_PATTERN.match(entry.name) or not os.path.isdir(uploads):
+            continue
+        for upload in os.scandir(uploads):
+            if upload.is_file() and allowed_file(upload.name):
+                try:
+                    hashes.add(file_content_hash(upload.path))
+                except OSError:
+                    pass
+    return hashes
+
+def prune_orphaned_entries(folder, entry_hash, live_hashes):
+    """
+    Remove the entries of a per-content cache folder whose file hash, entry_hash(entry),
+    no workspace holds anymore; entries it maps to None are kept. Returns how many were removed.
+    """
+    # Recent entries are kept, their upload may still be completing
+    cutoff = time.time() - app.config['JANITOR_INTERVAL_SECONDS']
+    removed = 0
+    for entry in os.scandir(folder):
+        file_hash = entry_hash(entry)
+        if file_hash is None or file_hash in live_hashes:
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                if entry.is_dir():
+                    shutil.rmtree(entry.path)
+                else:
+                    os.unlink(entry.path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+def clean_workspaces():
+    """Remove expired workspaces, then the least recently used ones until the quota is met."""
+    now = time.time()
+    with jobs_lock:
+        busy = {job['workspace'] for job in JOBS.values() if not job['finished']}
+    expired = 0
+    total = 0
+    candidates = []
+    for entry in os.scandir(app.config['WORKSPACE_FOLDER']):
+        if not entry.is_dir() or not WORKSPACE_PATTERN.match(entry.name):
+            continue
+        try:
+            used = entry.stat().st_mtime
+        except OSError:
+            continue
+        if entry.name not in busy and now - used > app.config['WORKSPACE_TTL_SECONDS']:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            expired += 1
+            continue
+        size = folder_size(entry.path)
+        total += size
+        # Workspaces with running jobs or used since the last sweep are never evicted for space
+        if entry.name not in busy and now - used > app.config['JANITOR_INTERVAL_SECONDS']:
+            candidates.append((used, size, entry.path))
+    candidates.sort()
+    evicted = 0
+    while candidates and total > app.config['WORKSPACE_QUOTA_BYTES']:
+        used, size, path = candidates.pop(0)
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        evicted += 1
+    with employee_index_lock:
+        for workspace_id in list(EMPLOYEE_INDEXES):
+            if not os.path.isdir(os.path.join(app.config['WORKSPACE_FOLDER'], workspace_id)):
+                del EMPLOYEE_INDEXES[workspace_id]
+    if expired or evicted:
+        logger.info(f"Janitor removed {expired} expired and {evicted} workspaces over quota, {total} bytes in use")
+    live_hashes = live_file_hashes()
+    pruned = prune_orphaned_entries(app.config['INDEX_FOLDER'], lambda entry: entry.name[:-len('.json')]
+                                    if entry.name.endswith('.json') else None, live_hashes)
+    if pruned:
+        logger.info(f"Janitor removed {pruned} block indexes of files no longer uploaded")
+    if app.config['COLUMNAR_FOLDER']:
+        pruned = prune_orphaned_entries(app.config['COLUMNAR_FOLDER'], lambda entry: entry.name
+                                        if entry.is_dir() else None, live_hashes)
+        if pruned:
+            logger.info(f"Janitor removed {pruned} columnar caches of files no longer uploaded")
+
+def janitor_loop():
+    while True:
+        time.sleep(app.config['JANITOR_INTERVAL_SECONDS'])
+        try:
+            clean_workspaces()
+            prune_jobs()
+            touch_jobs()
+        except Exception as e:
+            logger.error(f"Janitor error: {e}")
+
+def start_janitor():
+    global JANITOR
+    with janitor_lock:
+        if JANITOR is None:
+            JANITOR = threading.Thread(target=janitor_loop, name='janitor', daemon=True)
+            JANITOR.start()
+
+
+# Streaming uploads
+#
+# CSV files posted to /upload_files are not spooled to a temporary file and copied:
+# as werkzeug parses the multipart body, every chunk is written straight into the
+# workspace and fed to a BlockIndexBuilder, so the file is hashed and indexed while
+# it is still being received.
+class IngestStream:
+    """Writable upload container that saves, hashes and indexes a CSV file as it arrives."""
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.part_path = f"{file_path}.{uuid.uuid4().hex}.part"
+        self.file = open(self.part_path, 'w+b')
+        self.builder = BlockIndexBuilder()
+        self.index = None
+
+    def write(self, data):
+        self.file.write(data)
+        self.builder.feed(data)
+        return len(data)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+    def complete(self):
+        """Move the upload into place and store its block index; returns the file path."""
+        if self.index is None:
+            self.file.close()
+            os.replace(self.part_path, self.file_path)
+            self.index = self.builder.finish(self.file_path)
+            store_block_index(self.index)
+        return self.file_path
+
+    def close(self):
+        self.file.close()
+        if self.index is None and os.path.exists(self.part_path):
+            os.unlink(self.part_path)
+
+class IngestingRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.endpoint == 'upload_files' and filename and allowed_file(filename) and secure_filename(filename):
+            return IngestStream(os.path.join(get_workspace()['uploads'], secure_filename(filename)))
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
+app.request_class = IngestingRequest
+
+
+# Downloads
+#
+# Reports are sent with a strong ETag taken from their content hash, so a browser
+# revalidates with If-None-Match and resumes with Range instead of fetching every
+# byte again. With USE_X_SENDFILE or X_ACCEL_REDIRECT_PREFIX set the front proxy
+# sends the file (and serves ranges itself); Flask only answers the conditional request.
+def send_report(path):
+    etag = file_content_hash(path)
+    prefix = app.config['X_ACCEL_REDIRECT_PREFIX']
+    if not prefix and not app.config['USE_X_SENDFILE']:
+        return send_file(path, as_attachment=True, conditional=True, etag=etag)
+    # Ranges are left to the proxy: only the ETag is checked here, Range headers are ignored
+    response = send_file_from_proxy(path, request.environ, as_attachment=True, etag=etag, conditional=False,
+                                    use_x_sendfile=True, response_class=app.response_class)
+    response = response.make_conditional(request.environ, accept_ranges=False)
+    sendfile_path = response.headers.pop('X-Sendfile', None)
+    if response.status_code != 200:
+        # A 304 must not carry the offload header, or the proxy sends the file anyway
+        return response
+    if prefix and sendfile_path:
+        relative = os.path.relpath(sendfile_path, app.config['UPLOAD_FOLDER']).replace(os.sep, '/')
+        response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + urllib.parse.quote(relative)
+    elif sendfile_path:
+        response.headers['X-Sendfile'] = sendfile_path
+    return response
+
+
+# Report bundles
+#
+# /download_bundle/<job> streams every report of a finished job as one ZIP. zipfile
+# writes into a non-seekable buffer (entries get data descriptors instead of patched
+# headers) which the response generator drains after every chunk, so the archive is
+# never held in memory or staged on disk.
+class ZipStreamBuffer:
+    """Write-only, non-seekable file object collecting what zipfile writes until drained."""
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def bundle_entries(result, output_folder):
+    """(path, name in archive) of every report file of a job result, each file once."""
+    output_files = result['output_files']
+    entries = []
+    if output_files['xlsx']:
+        entries.append((output_files['xlsx']['filename'], output_files['xlsx']['filename']))
+    for kind in ['csv', 'html']:
+        entries.extend((entry['filename'], f"{kind}/{entry['filename']}") for entry in output_files[kind])
+    seen = set()
+    unique = []
+    for filename, arcname in entries:
+        if arcname not in seen:
+            seen.add(arcname)
+            unique.append((os.path.join(output_folder, filename), arcname))
+    return unique
+
+def stream_zip(entries):
+    """Yield a ZIP archive of the given (path, arcname) files chunk by chunk."""
+    chunk_size = app.config['BUNDLE_CHUNK_BYTES']
+    buffer = ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for path, arcname in entries:
+            try:
+                info = zipfile.ZipInfo.from_file(path, arcname)
+                source = open(path, 'rb')
+            except OSError as e:
+                logger.warning(f"Leaving {arcname} out of the bundle: {e}")
+                continue
+            # Workbooks are zip files already
+            info.compress_type = zipfile.ZIP_STORED if arcname.endswith('.xlsx') else zipfile.ZIP_DEFLATED
+            with source, archive.open(info, 'w') as dest:
+                for chunk in iter(lambda: source.read(chunk_size), b''):
+                    dest.write(chunk)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+# Result store
+#
+# A finished job's result is saved as JSON in its workspace, so /results/<job> renders
+# from that record (also after the job itself has been pruned) and the browser only
+# carries the job id. The page shows the first RESULTS_PAGE_SIZE log lines and reports
+# of each kind; the rest is paged in from /api/results/<job>.
+RESULT_SECTIONS = ('logs', 'csv', 'html')
+
+def save_job_result(workspace, job_id, result):
+    path = os.path.join(workspace['results'], f"{job_id}.json")
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+    os.replace(tmp_path, path)
+
+def load_job_result(workspace, job_id):
+    """The saved result of a finished job of this workspace, or None."""
+    if not valid_job_id(job_id):
+        return None
+    with jobs_lock:
+        job = find_job(job_id, workspace['id'])
+        if job is not None and job['result'] is not None:
+            return job['result']
+    try:
+        with open(os.path.join(workspace['results'], f"{job_id}.json"), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def result_section(result, section):
+    return result['logs'] if section == 'logs' else result['output_files'][section]
+
+def first_output_files(result):
+    """The result's output files, the CSV and HTML lists cut to their first RESULTS_PAGE_SIZE entries."""
+    page_size = app.config['RESULTS_PAGE_SIZE']
+    output_files = result['output_files']
+    return {'xlsx': output_files['xlsx'], 'csv': output_files['csv'][:page_size], 'html': output_files['html'][:page_size]}
+
+def result_summary(result):
+    return {
+        "search_by": result['search_by'],
+        "output_format": result['output_format'],
+        "department": result['department'],
+        "min_date": result['min_date'],
+        "max_date": result['max_date'],
+        "xlsx": result['output_files']['xlsx'],
+        "totals": {section: len(result_section(result, section)) for section in RESULT_SECTIONS},
+        "timings": result.get('timings', {}),
+        "stats": result.get('stats', {}),
+    }
+
+
+# Background jobs
+#
+# /process only validates the request and queues a job; the extraction runs on a
+# small thread pool and the browser polls /jobs/<id> for progress and the result,
+# or follows /jobs/<id>/events, a Server-Sent Events stream of its log lines and
+# per-employee completions. Each job keeps only the last JOB_EVENT_BUFFER events and
+# per-employee progress entries in memory; once finished, its progress is paged from
+# the saved result, where every employee's display name and render time are recorded.
+#
+# With several server processes, the polls may reach another process than the one
+# running the job. Every job therefore writes its state to <job>.job.json in the
+# workspace's results folder (on each status change, and at most every
+# JOB_STATE_INTERVAL_SECONDS for progress) and appends its events to <job>.events.jsonl,
+# which is rewritten with only the buffered events whenever it grows past
+# JOB_EVENT_LOG_MAX_BYTES; readers notice the new file and reopen it.
+# /jobs/<id> and /jobs/<id>/events fall back to these files for jobs run elsewhere.
+# The janitor touches the state files of a process's unfinished jobs, so a job whose
+# files have not changed for JOB_STALE_SECONDS belonged to a process that died and is
+# reported as failed.
+JOBS = {}
+jobs_lock = threading.Lock()
+jobs_changed = threading.Condition(jobs_lock)
+JOB_EXECUTOR = None
+
+def get_job_executor():
+    global JOB_EXECUTOR
+    with jobs_lock:
+        if JOB_EXECUTOR is None:
+            JOB_EXECUTOR = ThreadPoolExecutor(max_workers=app.config['JOB_WORKERS'], thread_name_prefix='job')
+        return JOB_EXECUTOR
+
+def prune_jobs():
+    cutoff = time.time() - app.config['JOB_TTL_SECONDS']
+    with jobs_lock:
+        for job_id in [job_id for job_id, job in JOBS.items() if job['finished'] and job['finished'] < cutoff]:
+            del JOBS[job_id]
+
+def submit_process_job(workspace, file_paths, identifiers, search_by, output_format, department, start_date=None, end_date=None):
+    prune_jobs()
+    job_id = uuid.uuid4().hex
+    job = {
+        'id': job_id,
+        'workspace': workspace['id'],
+        'status': 'queued',
+        'message': '',
+        'created': time.time(),
+        'started': None,
+        'finished': None,
+        'progress': {'completed': 0, 'total': len(identifiers) if identifiers is not None else 0},
+        'employees': deque(maxlen=app.config['JOB_EVENT_BUFFER']),
+        'employee_seconds': array('f'),
+        'events': deque(maxlen=app.config['JOB_EVENT_BUFFER']),
+        'last_event': 0,
+        'stages': StageTimings(),
+        'result': None,
+        'state_path': job_file(workspace, job_id, 'job.json'),
+        'state_saved': 0,
+        'event_log': open(job_file(workspace, job_id, 'events.jsonl'), 'a', encoding='utf-8'),
+        'event_log_bytes': 0,
+    }
+    with jobs_lock:
+        JOBS[job['id']] = job
+        save_job_state(job)
+    get_job_executor().submit(run_process_job, job, workspace, file_paths, identifiers, search_by, output_format, department,
+                              start_date, end_date)
+    logger.info(f"Queued job {job['id']} for {len(identifiers) if identifiers is not None else 'all'} identifiers")
+    return job
+
+def touch_jobs():
+    """Refresh the state files of this process's unfinished jobs, so other processes see them alive."""
+    with jobs_lock:
+        paths = [job['state_path'] for job in JOBS.values() if not job['finished']]
+    for path in paths:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+def job_file(workspace, job_id, kind):
+    return os.path.join(workspace['results'], f"{job_id}.{kind}")
+
+def job_output_folder(workspace, job_id):
+    """The folder a job writes its reports to, served by /download/<job>/ and the bundle."""
+    return os.path.join(workspace['output'], job_id)
+
+def job_is_stale(workspace, job_id):
+    """Whether neither file of a job has changed for JOB_STALE_SECONDS, i.e. no live process runs it."""
+    mtimes = []
+    for kind in ('job.json', 'events.jsonl'):
+        try:
+            mtimes.append(os.stat(job_file(workspace, job_id, kind)).st_mtime)
+        except OSError:
+            pass
+    return not mtimes or time.time() - max(mtimes) > app.config['JOB_STALE_SECONDS']
+
+def job_state(job):
+    """The part of a job other processes need to answer its status polls."""
+    state = {key: job[key] for key in ('id', 'workspace', 'status', 'message', 'created', 'started', 'finished')}
+    state.update(progress=dict(job['progress']), stages=job['stages'].rounded(), has_result=job['result'] is not None)
+    return state
+
+def save_job_state(job, throttle=False):
+    """Write the job's state file; with throttle, not more often than JOB_STATE_INTERVAL_SECONDS. The caller holds jobs_lock."""
+    now = time.time()
+    if throttle and now - job['state_saved'] < app.config['JOB_STATE_INTERVAL_SECONDS']:
+        return
+    job['state_saved'] = now
+    tmp_path = f"{job['state_path']}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(job_state(job), f)
+    os.replace(tmp_path, job['state_path'])
+
+STALE_JOB_MESSAGE = "The job stopped reporting progress; the server running it may have restarted"
+
+def load_job_state(workspace, job_id):
+    """The saved state of a job of this workspace, possibly run by another process, or None."""
+    if not valid_job_id(job_id):
+        return None
+    try:
+        with open(job_file(workspace, job_id, 'job.json'), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state['finished'] is None and job_is_stale(workspace, job_id):
+        state.update(status='failed', message=STALE_JOB_MESSAGE)
+    return state
+
+def add_job_event(job, event, data):
+    """Append an event to the job's stream and events file and wake its listeners. The caller holds jobs_lock."""
+    job['last_event'] += 1
+    job['events'].append((job['last_event'], event, data))
+    line = json.dumps([job['last_event'], event, data]) + '\n'
+    job['event_log'].write(line)
+    job['event_log'].flush()
+    job['event_log_bytes'] += len(line.encode('utf-8'))
+    if job['event_log_bytes'] > app.config['JOB_EVENT_LOG_MAX_BYTES']:
+        rotate_job_event_log(job)
+    jobs_changed.notify_all()
+
+def rotate_job_event_log(job):
+    """Replace the job's events file by one holding only its buffered events. The caller holds jobs_lock."""
+    path = job['event_log'].name
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for seq, event, data in job['events']:
+                f.write(json.dumps([seq, event, data]) + '\n')
+            size = f.tell()
+        os.replace(tmp_path, path)
+    except OSError as e:
+        # e.g. Windows, where a reader holding the file open blocks the replace; try again later
+        logger.warning(f"Could not rotate the events file of job {job['id']}: {e}")
+        job['event_log_bytes'] = 0
+        return
+    job['event_log'].close()
+    job['event_log'] = open(path, 'a', encoding='utf-8')
+    job['event_log_bytes'] = size
+
+def run_process_job(job, workspace, file_paths, identifiers, search_by, output_format, department, start_date=None, end_date=None):
+    with jobs_lock:
+        job['status'] = 'running'
+        job['started'] = time.time()
+        add_job_event(job, 'status', {'status': 'running'})
+        save_job_state(job)
+
+    def on_progress(completed, total, identifier, display_name, seconds):
+        employee = {'completed': completed, 'identifier': identifier, 'display': display_name, 'seconds': round(seconds, 4)}
+        with jobs_lock:
+            job['progress'] = {'completed': completed, 'total': total}
+            job['employees'].append(employee)
+            job['employee_seconds'].append(employee['seconds'])
+            add_job_event(job, 'employee', {'total': total, **employee})
+            save_job_state(job, throttle=True)
+
+    def on_log(message):
+        with jobs_lock:
+            add_job_event(job, 'log', {'message': message})
+
+    try:
+        output_folder = job_output_folder(workspace, job['id'])
+        os.makedirs(output_folder, exist_ok=True)
+        logs, output_files, display_names, min_date, max_date = extract_employee_logs(
+            file_paths, identifiers, search_by, output_format, department,
+            progress_callback=on_progress, log_callback=on_log, output_folder=output_folder,
+            start_date=start_date, end_date=end_date, timings=job['stages'])
+        result = {
+            "logs": logs,
+            "output_files": output_files,
+            "display_names": display_names,
+            # Render time of each employee, in display_names order
+            "employee_seconds": [round(seconds, 4) for seconds in job['employee_seconds']],
+            "search_by": search_by,
+            "output_format": output_format,
+            "department": department,
+            "min_date": min_date.strftime('%B %d, %Y') if min_date else '',
+            "max_date": max_date.strftime('%B %d, %Y') if max_date else '',
+            "stats": {"files": describe_files(file_paths)},
+            "timings": job['stages'].rounded()
+        }
+        save_job_result(workspace, job['id'], result)
+        with jobs_lock:
+            job['result'] = result
+            job['status'] = 'done'
+    except Exception as e:
+        logger.error(f"Error in job {job['id']}: {e}")
+        with jobs_lock:
+            job['status'] = 'failed'
+            job['message'] = f"Error generating reports: {str(e)}"
+    finally:
+        with jobs_lock:
+            job['finished'] = time.time()
+            add_job_event(job, 'end', {'status': job['status'], 'message': job['message']})
+            save_job_state(job)
+            job['event_log'].close()
+        job['stages'].observe()
+        count_metric('extractor_jobs_total', status=job['status'])
+
+def job_event_stream(job_id, last_seen=0):
+    """Yield the job's events after `last_seen` as SSE messages until the job has finished."""
+    keepalive = app.config['JOB_EVENT_KEEPALIVE_SECONDS']
+    while True:
+        with jobs_changed:
+            job = JOBS.get(job_id)
+            if job is None:
+                return
+            if job['last_event'] <= last_seen and not job['finished']:
+                jobs_changed.wait(keepalive)
+            events = [e for e in job['events'] if e[0] > last_seen]
+            finished = job['finished'] is not None
+        if not events:
+            if finished:
+                return
+            yield ": keepalive\n\n"
+            continue
+        for seq, event, data in events:
+            yield f"id: {seq}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+        last_seen = events[-1][0]
+
+def job_file_event_stream(workspace, job_id, last_seen=0):
+    """
+    Like job_event_stream, for a job of another process: follows its events file until
+    the end event, or ends the stream with a failed end event once the job is stale.
+    """
+    keepalive = app.config['JOB_EVENT_KEEPALIVE_SECONDS']
+    poll = app.config['JOB_EVENT_POLL_SECONDS']
+    idle = 0
+    pending = ''
+    path = job_file(workspace, job_id, 'events.jsonl')
+    f = open(path, 'r', encoding='utf-8')
+    try:
+        while True:
+            chunk = f.read()
+            if not chunk:
+                if events_file_replaced(f, path):
+                    # Rotated: the new file starts over with the buffered events, seen ones are skipped
+                    f.close()
+                    f = open(path, 'r', encoding='utf-8')
+                    pending = ''
+                    continue
+                if job_is_stale(workspace, job_id):
+                    data = {'status': 'failed', 'message': STALE_JOB_MESSAGE}
+                    yield f"id: {last_seen + 1}\nevent: end\ndata: {json.dumps(data)}\n\n"
+                    return
+                if idle >= keepalive:
+                    yield ": keepalive\n\n"
+                    idle = 0
+                time.sleep(poll)
+                idle += poll
+                continue
+            idle = 0
+            # The last line may still be being written
+            *lines, pending = (pending + chunk).split('\n')
+            for line in lines:
+                seq, event, data = json.loads(line)
+                if seq > last_seen:
+                    yield f"id: {seq}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+                    last_seen = seq
+                if event == 'end':
+                    return
+    finally:
+        f.close()
+
+def events_file_replaced(f, path):
+    """Whether the events file at path is no longer the one f has open."""
+    try:
+        return os.stat(path).st_ino != os.fstat(f.fileno()).st_ino
+    except OSError:
+        return False
+
+def read_job_events(workspace, job_id):
+    """The (seq, event, data) events a job has written to its events file so far."""
+    try:
+        with open(job_file(workspace, job_id, 'events.jsonl'), 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.endswith('\n')]
+    except (OSError, ValueError):
+        return []
+
+def find_job(job_id, workspace_id):
+    """The job with this id if it belongs to the given workspace."""
+    job = JOBS.get(job_id)
+    if job is None or job['workspace'] != workspace_id:
+        return None
+    return job
+
+def result_employees(result, since, limit):
+    """Per-employee progress entries of a finished job, the `limit` after the first `since`."""
+    seconds = result.get('employee_seconds', [])
+    entries = itertools.islice(result['display_names'].items(), since, since + limit)
+    return [{'completed': completed, 'identifier': identifier, 'display': display,
+             'seconds': seconds[completed - 1] if completed <= len(seconds) else 0.0}
+            for completed, (identifier, display) in enumerate(entries, start=since + 1)]
+
+def job_snapshot(job_id, workspace, since=0, limit=None):
+    """
+    A JSON-ready copy of the job; only up to `limit` per-employee progress entries after
+    `since` are included, from the saved result once the job has one.
+
+    Jobs this process does not know are read from the state and events files in the workspace.
+    """
+    limit = limit or app.config['RESULTS_PAGE_SIZE']
+    with jobs_lock:
+        job = find_job(job_id, workspace['id'])
+        if job is not None:
+            state = job_state(job)
+            employees = [employee for employee in job['employees'] if employee['completed'] > since][:limit]
+    if job is None:
+        state = load_job_state(workspace, job_id)
+        if state is None:
+            return None
+        employees = [{key: data[key] for key in ('completed', 'identifier', 'display', 'seconds')}
+                     for _, event, data in read_job_events(workspace, job_id)
+                     if event == 'employee' and data['completed'] > since][:limit]
+    result = load_job_result(workspace, job_id) if state['has_result'] else None
+    if result:
+        employees = result_employees(result, since, limit)
+    started = state['started'] or time.time()
+    finished = state['finished'] or time.time()
+    return {
+        'job_id': state['id'],
+        'status': state['status'],
+        'message': state['message'],
+        'progress': state['progress'],
+        'employees': employees,
+        'timings': {
+            'queued_seconds': round(started - state['created'], 4),
+            'run_seconds': round(finished - started, 4) if state['started'] else 0,
+            'stages': state['stages'],
+        },
+        'result_url': url_for('job_results', job_id=state['id']) if result else None,
+        # The first page only; the rest is listed by /api/results/<job>
+        'output_files': first_output_files(result) if result else None,
+    }
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint = request.endpoint or 'unknown'
+    count_metric('extractor_http_requests_total', endpoint=endpoint, method=request.method, status=response.status_code)
+    if 'request_started' in g:
+        observe_metric('extractor_http_request_seconds', time.perf_counter() - g.request_started, endpoint=endpoint)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+
 @app.route('/')
 def index():
-    for file in os.listdir(app.config['UPLOAD_FOLDER']):
-        if file != 'output':
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], file)
-            try:
-                if os.path.isfile(file_path):
-                    os.unlink(file_path)
-            except Exception as e:
-                logger.error(f"Error deleting {file_path}: {e}")
+    workspace = get_workspace()
+    for file in os.listdir(workspace['uploads']):
+        file_path = os.path.join(workspace['uploads'], file)
+        try:
+            if os.path.isfile(file_path):
+                os.unlink(file_path)
+        except Exception as e:
+            logger.error(f"Error deleting {file_path}: {e}")
     return render_template('index.html', departments=DEPARTMENTS)
 
 @app.route('/upload_files', methods=['POST'])
@@ -618,20 +2899,37 @@ def upload_files():
     if not department:
         return jsonify({"success": False, "message": "Please select a department"})
     
+    workspace = get_workspace()
     file_paths = []
     for file in files:
         if file and allowed_file(file.filename):
             filename = secure_filename(file.filename)
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(file_path)
+            if isinstance(file.stream, IngestStream):
+                file_path = file.stream.complete()
+            else:
+                file_path = os.path.join(workspace['uploads'], filename)
+                file.save(file_path)
             file_paths.append(file_path)
+            count_metric('extractor_ingested_files_total')
+            count_metric('extractor_ingested_bytes_total', os.path.getsize(file_path))
     
     try:
-        employees = extract_employees_from_csv(file_paths)
+        employees = get_employee_index(workspace).employees
+        covered = [index['days'] for index in get_block_indexes(uploaded_csv_files(workspace)) if index and index['days']]
+        # Fill the attendance store (or else the columnar cache) now, so extraction never parses CSV
+        for file_path, index in zip(file_paths, get_block_indexes(file_paths)):
+            if index is None:
+                continue
+            if get_attendance_db() is not None:
+                store_file_blocks(file_path, index)
+            elif app.config['COLUMNAR_FOLDER']:
+                get_columnar_cache(file_path, index)
         return jsonify({
             "success": True,
             "message": f"Found {len(employees)} employees",
-            "employee_data": employees,
+            "employee_count": len(employees),
+            "first_date": datetime.fromordinal(min(days[0] for days in covered)).strftime('%Y-%m-%d') if covered else None,
+            "last_date": datetime.fromordinal(max(days[1] for days in covered)).strftime('%Y-%m-%d') if covered else None,
             "department": department
         })
     except Exception as e:
@@ -641,6 +2939,46 @@ def upload_files():
             "message": f"Error processing files: {str(e)}"
         })
 
+@app.route('/employees')
+def search_employees():
+    index = get_employee_index(get_workspace())
+    matches = index.search(request.args.get('q', ''))
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = min(max(1, request.args.get('limit', app.config['EMPLOYEE_PAGE_SIZE'], type=int)), app.config['EMPLOYEE_PAGE_MAX'])
+    return jsonify({
+        "success": True,
+        "total": len(matches),
+        "offset": offset,
+        "employees": [index.employees[position] for position in matches[offset:offset + limit]]
+    })
+
+@app.route('/api/attendance')
+def attendance_history():
+    if get_attendance_db() is None:
+        return jsonify({"success": False, "message": "The attendance store is not enabled"}), 404
+    identifier = request.args.get('identifier', '').strip()
+    search_by = request.args.get('search_by', 'id')
+    if not identifier:
+        return jsonify({"success": False, "message": "An employee name or Att-ID is required"}), 400
+    start, end = request.args.get('start_date'), request.args.get('end_date')
+    try:
+        for value in (start, end):
+            if value:
+                datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        return jsonify({"success": False, "message": "Dates must be given as YYYY-MM-DD"}), 400
+    # Other sessions' uploads are only visible when the history is shared on purpose
+    file_hashes = None
+    if not app.config['ATTENDANCE_SHARED_HISTORY']:
+        file_hashes = [file_content_hash(path) for path in uploaded_csv_files(get_workspace())]
+    rows = query_attendance(identifier, search_by, start or None, end or None, file_hashes)
+    return jsonify({
+        "success": True,
+        "identifier": identifier,
+        "search_by": search_by,
+        "days": [{"date": date, **dict(zip(column_header, cells))} for date, column_header, cells in rows],
+    })
+
 @app.route('/process', methods=['POST'])
 def process():
     search_by = request.form.get('search_by', 'name')
@@ -650,13 +2988,16 @@ def process():
     
     if manual_identifier:
         identifiers.append(manual_identifier)
-    if not identifiers:
+    if request.form.get('scope') == 'all':
+        # Every employee in the uploaded files, no identifier list needed
+        identifiers = None
+        search_by = 'id'
+    elif not identifiers:
         logger.warning("No identifiers provided for processing")
         return jsonify({"success": False, "message": "At least one employee must be selected"})
     
-    file_paths = [os.path.join(app.config['UPLOAD_FOLDER'], f) 
-                 for f in os.listdir(app.config['UPLOAD_FOLDER']) 
-                 if f.endswith('.csv')]
+    workspace = get_workspace()
+    file_paths = uploaded_csv_files(workspace)
     
     if not file_paths:
         logger.warning("No CSV files found in upload folder")
@@ -664,22 +3005,92 @@ def process():
     
     output_format = request.form.get('output_format', 'xlsx')
     try:
-        logs, output_files, display_names, min_date, max_date = extract_employee_logs(file_paths, identifiers, search_by, output_format, department)
+        start_date, end_date = [datetime.strptime(value, '%Y-%m-%d') if value else None
+                                for value in (request.form.get('start_date'), request.form.get('end_date'))]
+    except ValueError:
+        return jsonify({"success": False, "message": "Dates must be given as YYYY-MM-DD"}), 400
+    if start_date and end_date and start_date > end_date:
+        return jsonify({"success": False, "message": "The start date must not be after the end date"}), 400
+    if start_date or end_date:
+        # An open end stops at the days the uploaded files cover
+        start_date, end_date = resolve_date_range(file_paths, start_date, end_date)
+        if (end_date - start_date).days + 1 > app.config['REPORT_MAX_DAYS']:
+            return jsonify({"success": False, "message": f"The report range may span at most {app.config['REPORT_MAX_DAYS']} days"}), 400
+    try:
+        job = submit_process_job(workspace, file_paths, identifiers, search_by, output_format, department, start_date, end_date)
         return jsonify({
             "success": True,
-            "logs": logs,
-            "output_files": output_files,
-            "display_names": display_names,
-            "search_by": search_by,
-            "output_format": output_format,
-            "department": department,
-            "min_date": min_date.strftime('%B %d, %Y') if min_date else '',
-            "max_date": max_date.strftime('%B %d, %Y') if max_date else ''
+            "job_id": job['id'],
+            "status_url": url_for('job_status', job_id=job['id'])
         })
     except Exception as e:
         logger.error(f"Error in process endpoint: {e}")
         return jsonify({"success": False, "message": f"Error generating reports: {str(e)}"})
 
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    since = max(0, request.args.get('since', 0, type=int))
+    limit = min(max(1, request.args.get('limit', app.config['RESULTS_PAGE_SIZE'], type=int)), app.config['RESULTS_PAGE_MAX'])
+    job = job_snapshot(job_id, get_workspace(), since, limit)
+    if job is None:
+        return jsonify({"success": False, "message": "Unknown job"}), 404
+    return jsonify({"success": True, **job})
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    workspace = get_workspace()
+    # EventSource sends Last-Event-ID when it reconnects
+    last_seen = request.headers.get('Last-Event-ID', type=int) or request.args.get('since', 0, type=int)
+    if find_job(job_id, workspace['id']) is not None:
+        events = job_event_stream(job_id, last_seen)
+    elif load_job_state(workspace, job_id) is not None:
+        events = job_file_event_stream(workspace, job_id, last_seen)
+    else:
+        return jsonify({"success": False, "message": "Unknown job"}), 404
+    return Response(stream_with_context(events),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/download_bundle/<job_id>')
+def download_bundle(job_id):
+    workspace = get_workspace()
+    result = load_job_result(workspace, job_id)
+    if result is None:
+        flash("The reports of this job are no longer available", 'error')
+        return redirect(url_for('index'))
+    entries = bundle_entries(result, job_output_folder(workspace, job_id))
+    return Response(stream_zip(entries), mimetype='application/zip', headers={
+        'Content-Disposition': f'attachment; filename="Employee_Reports_{job_id[:8]}.zip"',
+        'X-Accel-Buffering': 'no',
+    })
+
+@app.route('/results/<job_id>')
+def job_results(job_id):
+    result = load_job_result(get_workspace(), job_id)
+    if result is None:
+        flash("The results of this job are no longer available", 'error')
+        return redirect(url_for('index'))
+    page_size = app.config['RESULTS_PAGE_SIZE']
+    summary = result_summary(result)
+    return render_template('results.html', logs=result['logs'][:page_size], output_files=first_output_files(result), display_names={},
+                           search_by=summary['search_by'], output_format=summary['output_format'], department=summary['department'],
+                           min_date=summary['min_date'], max_date=summary['max_date'], job_id=job_id, totals=summary['totals'])
+
+@app.route('/api/results/<job_id>')
+def job_results_api(job_id):
+    result = load_job_result(get_workspace(), job_id)
+    if result is None:
+        return jsonify({"success": False, "message": "Unknown job"}), 404
+    section = request.args.get('section')
+    if section is None:
+        return jsonify({"success": True, "job_id": job_id, **result_summary(result)})
+    if section not in RESULT_SECTIONS:
+        return jsonify({"success": False, "message": f"Unknown section {section}"}), 400
+    items = result_section(result, section)
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = min(max(1, request.args.get('limit', app.config['RESULTS_PAGE_SIZE'], type=int)), app.config['RESULTS_PAGE_MAX'])
+    return jsonify({"success": True, "section": section, "offset": offset, "total": len(items), "items": items[offset:offset + limit]})
+
 @app.route('/results')
 def results():
     logs = request.args.get('logs', '').split('|')
@@ -702,16 +3113,24 @@ def results():
     department = request.args.get('department', '')
     min_date = request.args.get('min_date', '')
     max_date = request.args.get('max_date', '')
-    return render_template('results.html', logs=logs, output_files=output_files, display_names=display_names, search_by=search_by, output_format=output_format, department=department, min_date=min_date, max_date=max_date)
+    return render_template('results.html', logs=logs, output_files=output_files, display_names=display_names, search_by=search_by, output_format=output_format, department=department, min_date=min_date, max_date=max_date, job_id=None)
 
 @app.route('/download/<filename>')
-def download_file(filename):
-    try:
-        return send_file(os.path.join(app.config['OUTPUT_FOLDER'], filename), as_attachment=True)
-    except Exception as e:
-        logger.error(f"Error downloading file {filename}: {e}")
-        flash(f"Error downloading file: {str(e)}", 'error')
-        return redirect(url_for('index'))
+@app.route('/download/<job_id>/<filename>')
+def download_file(filename, job_id=None):
+    """A report of a job; without a job id, a file of the legacy /results links in the output folder itself."""
+    workspace = get_workspace()
+    if job_id is None:
+        folder = workspace['output']
+    elif valid_job_id(job_id):
+        folder = job_output_folder(workspace, job_id)
+    else:
+        abort(404)
+    path = safe_join(folder, filename)
+    if path is None or not os.path.isfile(path):
+        logger.warning(f"Download of missing file {filename}")
+        abort(404)
+    return send_report(path)
 
 if __name__ == '__main__':
     templates_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
@@ -780,6 +3199,7 @@ if __name__ == '__main__':
             color: #2980b9;
         }
         input[type="text"],
+        input[type="date"],
         select {
             width: 100%;
             padding: 16px 20px;
@@ -791,12 +3211,31 @@ if __name__ == '__main__':
             box-shadow: inset 0 2px 5px rgba(0, 0, 0, 0.05);
         }
         input[type="text"]:focus,
+        input[type="date"]:focus,
         select:focus {
             border-color: #3498db;
             background: #fff;
             outline: none;
             box-shadow: 0 0 15px rgba(52, 152, 219, 0.4), inset 0 2px 5px rgba(0, 0, 0, 0.05);
         }
+        .date-range {
+            display: flex;
+            gap: 25px;
+            flex-wrap: wrap;
+        }
+        .date-range > div {
+            flex: 1;
+            min-width: 200px;
+        }
+        .date-range label {
+            font-size: 1rem;
+            font-weight: 500;
+        }
+        .date-hint {
+            margin-top: 10px;
+            font-size: 0.9rem;
+            color: #7f8c8d;
+        }
         .search-options {
             display: flex;
             gap: 25px;
@@ -1029,6 +3468,20 @@ if __name__ == '__main__':
             animation: spin 1.2s linear infinite;
             margin-right: 20px;
         }
+        .progress-log {
+            background-color: #f9fafb;
+            border: 1px solid #ecf0f1;
+            border-radius: 15px;
+            padding: 18px;
+            font-size: 0.9rem;
+            max-height: 250px;
+            overflow-y: auto;
+            display: none;
+        }
+        .progress-log div {
+            margin-bottom: 6px;
+            line-height: 1.5;
+        }
         @keyframes spin {
             0% { transform: rotate(0deg); }
             100% { transform: rotate(360deg); }
@@ -1037,6 +3490,10 @@ if __name__ == '__main__':
             background: linear-gradient(90deg, #95a5a6, #7f8c8d);
             margin-right: 15px;
         }
+        .all-employees-button {
+            background: linear-gradient(90deg, #16a085, #1abc9c);
+            margin-right: 15px;
+        }
         .button-row {
             display: flex;
             gap: 20px;
@@ -1206,6 +3663,20 @@ if __name__ == '__main__':
                     </div>
                 </div>
             </div>
+            <div class="form-group">
+                <label>Report Period</label>
+                <div class="date-range">
+                    <div>
+                        <label for="start_date">From</label>
+                        <input type="date" id="start_date" name="start_date">
+                    </div>
+                    <div>
+                        <label for="end_date">To</label>
+                        <input type="date" id="end_date" name="end_date">
+                    </div>
+                </div>
+                <div class="date-hint" id="date-hint">Leave empty to report the month found in the files.</div>
+            </div>
             <div class="form-group download-options">
                 <label for="output_format">Download Format</label>
                 <select id="output_format" name="output_format">
@@ -1217,6 +3688,7 @@ if __name__ == '__main__':
             </div>
             <div class="button-row">
                 <button class="back-button" id="back-to-upload-button" type="button">Back to Upload</button>
+                <button class="all-employees-button" id="generate-all-button" type="button" title="Generate reports for every employee in the uploaded files">All Employees in Files</button>
                 <button id="generate-reports-button" type="button" disabled>Generate Reports</button>
             </div>
         </div>
@@ -1226,8 +3698,9 @@ if __name__ == '__main__':
             </div>
             <div class="loading">
                 <div class="spinner"></div>
-                <span>Processing files...</span>
+                <span id="processing-status">Processing files...</span>
             </div>
+            <div class="progress-log" id="progress-log"></div>
         </div>
         <footer>
             © 2025 Employee Log Extractor | Developed by Mir Abdul Aziz Khan
@@ -1247,6 +3720,7 @@ if __name__ == '__main__':
             const employeeSearchInput = document.getElementById('employee-search-input');
             const backToUploadButton = document.getElementById('back-to-upload-button');
             const generateReportsButton = document.getElementById('generate-reports-button');
+            const generateAllButton = document.getElementById('generate-all-button');
             const selectedEmployeesDisplay = document.getElementById('selected-employees');
             const selectedEmployeesList = document.getElementById('selected-employees-list');
             const searchByName = document.getElementById('search_by_name');
@@ -1255,9 +3729,17 @@ if __name__ == '__main__':
             const addManualButton = document.getElementById('add-manual-button');
             const selectAllButton = document.getElementById('select-all-button');
             const outputFormatSelect = document.getElementById('output_format');
+            const startDateInput = document.getElementById('start_date');
+            const endDateInput = document.getElementById('end_date');
+            const dateHint = document.getElementById('date-hint');
             const departmentSelect = document.getElementById('department');
             
             let employeesData = [];
+            let employeeTotal = 0;
+            let matchingTotal = 0;
+            let searchTimer = null;
+            let searchToken = 0;
+            let loadingEmployees = false;
             let selectedEmployees = [];
             let manualEmployees = [];
             let selectedDepartment = '';
@@ -1289,7 +3771,15 @@ if __name__ == '__main__':
                 uploadSection.style.display = 'block';
             });
             generateReportsButton.addEventListener('click', handleGenerateReports);
+            generateAllButton.addEventListener('click', handleGenerateAll);
             employeeSearchInput.addEventListener('input', filterEmployees);
+            employeeList.addEventListener('scroll', function() {
+                // Load the next page of matches when the list is scrolled near its end
+                if (!loadingEmployees && employeesData.length < matchingTotal &&
+                    employeeList.scrollTop + employeeList.clientHeight >= employeeList.scrollHeight - 50) {
+                    loadEmployees(true);
+                }
+            });
             selectAllButton.addEventListener('click', toggleSelectAll);
             manualIdentifierInput.addEventListener('input', updateManualState);
             addManualButton.addEventListener('click', addManualEmployee);
@@ -1343,10 +3833,18 @@ if __name__ == '__main__':
                     if (data.success) {
                         uploadSection.style.display = 'none';
                         employeeSelectionSection.style.display = 'block';
-                        employeeCount.textContent = `${data.employee_data.length} employee${data.employee_data.length !== 1 ? 's' : ''} found`;
-                        employeesData = data.employee_data;
+                        employeeCount.textContent = `${data.employee_count} employee${data.employee_count !== 1 ? 's' : ''} found`;
+                        employeeTotal = data.employee_count;
                         selectedDepartment = data.department;
-                        displayEmployees(employeesData);
+                        employeeSearchInput.value = '';
+                        loadEmployees(false);
+                        [startDateInput, endDateInput].forEach(input => {
+                            input.min = data.first_date || '';
+                            input.max = data.last_date || '';
+                        });
+                        if (data.first_date) {
+                            dateHint.textContent = `The files cover ${data.first_date} to ${data.last_date}. Leave empty to report the month found in the files.`;
+                        }
                     } else {
                         alert(data.message);
                     }
@@ -1358,9 +3856,50 @@ if __name__ == '__main__':
                 });
             }
             
-            function displayEmployees(employees) {
-                employeeList.innerHTML = '';
-                if (!employees || employees.length === 0) {
+            function fetchEmployees(query, offset, limit) {
+                return fetch(`/employees?q=${encodeURIComponent(query)}&offset=${offset}${limit ? `&limit=${limit}` : ''}`)
+                .then(response => response.json())
+                .then(data => {
+                    if (!data.success) {
+                        throw new Error(data.message);
+                    }
+                    return data;
+                });
+            }
+            
+            function loadEmployees(append) {
+                const token = append ? searchToken : ++searchToken;
+                loadingEmployees = true;
+                fetchEmployees(employeeSearchInput.value, append ? employeesData.length : 0)
+                .then(data => {
+                    if (token !== searchToken) {
+                        return;  // A newer search has replaced this one
+                    }
+                    employeesData = append ? employeesData.concat(data.employees) : data.employees;
+                    matchingTotal = data.total;
+                    displayEmployees(data.employees, append);
+                })
+                .catch(error => console.error('Fetch error:', error))
+                .finally(() => {
+                    if (token === searchToken) {
+                        loadingEmployees = false;
+                    }
+                });
+            }
+            
+            function fetchAllEmployees(collected = []) {
+                return fetchEmployees('', collected.length, 1000).then(data => {
+                    collected.push(...data.employees);
+                    return collected.length < data.total && data.employees.length ? fetchAllEmployees(collected) : collected;
+                });
+            }
+            
+            function displayEmployees(employees, append) {
+                if (!append) {
+                    employeeList.innerHTML = '';
+                    employeeList.scrollTop = 0;
+                }
+                if (!append && (!employees || employees.length === 0)) {
                     employeeList.innerHTML = '<div class="employee-item"><span class="employee-name">No employees found</span></div>';
                     return;
                 }
@@ -1410,13 +3949,26 @@ if __name__ == '__main__':
             }
             
             function toggleSelectAll() {
-                if (selectedEmployees.length === employeesData.length) {
+                if (selectedEmployees.length === employeeTotal) {
                     selectedEmployees = [];
                     document.querySelectorAll('.employee-item').forEach(item => item.classList.remove('selected'));
+                    updateSelection();
                 } else {
-                    selectedEmployees = [...employeesData];
-                    document.querySelectorAll('.employee-item').forEach(item => item.classList.add('selected'));
+                    selectAllButton.disabled = true;
+                    fetchAllEmployees()
+                    .then(employees => {
+                        selectedEmployees = employees;
+                        document.querySelectorAll('.employee-item').forEach(item => item.classList.add('selected'));
+                        updateSelection();
+                    })
+                    .catch(error => alert('Error loading employees: ' + error.message))
+                    .finally(() => {
+                        selectAllButton.disabled = false;
+                    });
                 }
+            }
+            
+            function updateSelection() {
                 updateSelectedEmployeesDisplay();
                 updateButtonState();
                 if (selectedEmployees.length > 0) {
@@ -1447,13 +3999,9 @@ if __name__ == '__main__':
             }
             
             function filterEmployees() {
-                const searchTerm = employeeSearchInput.value.toLowerCase();
-                const filteredEmployees = employeesData.filter(employee => {
-                    const nameMatch = employee.name && employee.name.toLowerCase().includes(searchTerm);
-                    const idMatch = employee.id && employee.id.toLowerCase().includes(searchTerm);
-                    return nameMatch || idMatch;
-                });
-                displayEmployees(filteredEmployees);
+                // The server searches the roster; wait for a pause in typing before asking it
+                clearTimeout(searchTimer);
+                searchTimer = setTimeout(() => loadEmployees(false), 250);
             }
             
             function updateManualState() {
@@ -1496,45 +4044,131 @@ if __name__ == '__main__':
                 manualEmployees.forEach(emp => {
                     formData.append('identifiers', emp);
                 });
+                submitReports(formData);
+            }
+            
+            function handleGenerateAll() {
+                const formData = new FormData();
+                formData.append('scope', 'all');
+                formData.append('search_by', 'id');
+                formData.append('output_format', outputFormatSelect.value);
+                formData.append('department', selectedDepartment);
+                submitReports(formData);
+            }
+            
+            function submitReports(formData) {
+                if (startDateInput.value && endDateInput.value && startDateInput.value > endDateInput.value) {
+                    alert('The start date must not be after the end date');
+                    return;
+                }
+                if (startDateInput.value) {
+                    formData.append('start_date', startDateInput.value);
+                }
+                if (endDateInput.value) {
+                    formData.append('end_date', endDateInput.value);
+                }
                 employeeSelectionSection.style.display = 'none';
                 processingSection.style.display = 'block';
                 generateReportsButton.disabled = true;
+                generateAllButton.disabled = true;
                 
-                const controller = new AbortController();
-                const timeoutId = setTimeout(() => controller.abort(), 60000);
+                const processingStatus = document.getElementById('processing-status');
+                processingStatus.textContent = 'Processing files...';
+                progressLog.innerHTML = '';
+                progressLog.style.display = 'none';
                 
                 fetch('/process', {
                     method: 'POST',
-                    body: formData,
-                    signal: controller.signal
-                })
-                .then(response => {
-                    clearTimeout(timeoutId);
-                    if (!response.ok) {
-                        throw new Error(`HTTP error! status: ${response.status}`);
-                    }
-                    return response.json();
+                    body: formData
                 })
+                .then(response => response.json().catch(() => {
+                    throw new Error(`HTTP error! status: ${response.status}`);
+                }))
                 .then(data => {
-                    if (data.success) {
-                        const csvFiles = data.output_files.csv.map(f => `csv[]=${encodeURIComponent(f.filename)}&csv_display[]=${encodeURIComponent(f.display)}`).join('&');
-                        const htmlFiles = data.output_files.html.map(f => `html[]=${encodeURIComponent(f.filename)}&html_display[]=${encodeURIComponent(f.display)}`).join('&');
-                        const xlsxFile = data.output_files.xlsx ? `xlsx=${encodeURIComponent(data.output_files.xlsx.filename)}&xlsx_display=${encodeURIComponent(data.output_files.xlsx.display)}` : '';
-                        const url = `/results?logs=${encodeURIComponent(data.logs.join('|'))}&${xlsxFile}&${csvFiles}&${htmlFiles}&search_by=${encodeURIComponent(data.search_by)}&output_format=${encodeURIComponent(data.output_format)}&department=${encodeURIComponent(data.department)}&min_date=${encodeURIComponent(data.min_date)}&max_date=${encodeURIComponent(data.max_date)}`;
-                        window.location.href = url;
-                    } else {
+                    if (!data.success) {
                         throw new Error(data.message);
                     }
+                    return window.EventSource
+                        ? streamJob(data.status_url, processingStatus)
+                        : pollJob(data.status_url, processingStatus);
+                })
+                .then(resultUrl => {
+                    window.location.href = resultUrl;
                 })
                 .catch(error => {
                     console.error('Fetch error:', error);
                     processingSection.style.display = 'none';
                     employeeSelectionSection.style.display = 'block';
                     generateReportsButton.disabled = false;
+                    generateAllButton.disabled = false;
                     alert('Error generating reports: ' + (error.message || 'Unknown error'));
                 });
             }
             
+            const MAX_PROGRESS_LINES = 200;
+            const progressLog = document.getElementById('progress-log');
+            
+            function addProgressLine(text) {
+                const line = document.createElement('div');
+                line.textContent = text;
+                progressLog.appendChild(line);
+                while (progressLog.childElementCount > MAX_PROGRESS_LINES) {
+                    progressLog.removeChild(progressLog.firstChild);
+                }
+                progressLog.style.display = 'block';
+                progressLog.scrollTop = progressLog.scrollHeight;
+            }
+            
+            function streamJob(statusUrl, statusElement) {
+                return new Promise((resolve, reject) => {
+                    const source = new EventSource(`${statusUrl}/events`);
+                    source.addEventListener('log', event => {
+                        addProgressLine(JSON.parse(event.data).message);
+                    });
+                    source.addEventListener('employee', event => {
+                        const data = JSON.parse(event.data);
+                        statusElement.textContent = `Processed ${data.completed} of ${data.total} employees...`;
+                    });
+                    source.addEventListener('end', () => {
+                        source.close();
+                        pollJob(statusUrl, statusElement).then(resolve, reject);
+                    });
+                    source.onerror = () => {
+                        // The stream is gone (job expired or server restarted), fall back to polling
+                        source.close();
+                        pollJob(statusUrl, statusElement).then(resolve, reject);
+                    };
+                });
+            }
+            
+            function pollJob(statusUrl, statusElement) {
+                let since = 0;
+                return new Promise((resolve, reject) => {
+                    const poll = () => {
+                        fetch(`${statusUrl}?since=${since}`)
+                        .then(response => response.json())
+                        .then(job => {
+                            if (!job.success) {
+                                throw new Error(job.message);
+                            }
+                            since += job.employees.length;
+                            if (job.status === 'done') {
+                                resolve(job.result_url);
+                            } else if (job.status === 'failed') {
+                                throw new Error(job.message);
+                            } else {
+                                if (job.status === 'running' && job.progress.total) {
+                                    statusElement.textContent = `Processed ${job.progress.completed} of ${job.progress.total} employees...`;
+                                }
+                                setTimeout(poll, 1000);
+                            }
+                        })
+                        .catch(reject);
+                    };
+                    poll();
+                });
+            }
+            
             employeeList.innerHTML = '<div class="employee-item"><span class="employee-name">Upload files to see employees</span></div>';
         });
     </script>
@@ -1686,6 +4320,26 @@ if __name__ == '__main__':
             transform: translateY(-3px);
             box-shadow: 0 8px 20px rgba(52, 152, 219, 0.4);
         }
+        .load-more {
+            margin-top: 15px;
+            background: none;
+            border: 1px solid #3498db;
+            color: #2980b9;
+            padding: 8px 20px;
+            border-radius: 10px;
+            font-family: inherit;
+            font-weight: 500;
+            cursor: pointer;
+            transition: all 0.3s ease;
+        }
+        .load-more:hover {
+            background: #3498db;
+            color: white;
+        }
+        .load-more:disabled {
+            opacity: 0.6;
+            cursor: default;
+        }
         .buttons {
             margin-top: 40px;
             display: flex;
@@ -1737,7 +4391,7 @@ if __name__ == '__main__':
             <p>Search method: {% if search_by == 'name' %}By Name{% else %}By ID{% endif %} | Format: {{ output_format|upper }}</p>
         </div>
         <h3>Processing Log</h3>
-        <div class="log-container">
+        <div class="log-container" id="log-lines">
             {% for log in logs %}
                 <div class="log-line 
                     {% if '[✅]' in log or '✅' in log %}success-line{% endif %}
@@ -1747,36 +4401,53 @@ if __name__ == '__main__':
                 </div>
             {% endfor %}
         </div>
+        {% if totals and totals.logs > logs|length %}
+            <button type="button" class="load-more" data-section="logs" data-target="log-lines">Show more log lines ({{ totals.logs }} in total)</button>
+        {% endif %}
         {% if output_files[output_format] or output_format == 'all' %}
             <div class="download-section">
                 <h3 class="download-header">Download Reports</h3>
                 {% if output_files.xlsx %}
                     <h4>Excel Report</h4>
                     <div class="download-buttons">
-                        <a href="{{ url_for('download_file', filename=output_files.xlsx.filename) }}" class="download-button" title="{{ output_files.xlsx.display }}">
+                        <a href="{{ url_for('download_file', job_id=job_id, filename=output_files.xlsx.filename) }}" class="download-button" title="{{ output_files.xlsx.display }}">
                             {{ output_files.xlsx.display }}
                         </a>
                     </div>
                 {% endif %}
                 {% if output_files.csv or (output_format == 'all' and output_files.csv) %}
                     <h4>CSV Reports</h4>
-                    <div class="download-buttons">
+                    <div class="download-buttons" id="csv-files">
                         {% for file in output_files.csv %}
-                            <a href="{{ url_for('download_file', filename=file.filename) }}" class="download-button" title="{{ file.display }}">
+                            <a href="{{ url_for('download_file', job_id=job_id, filename=file.filename) }}" class="download-button" title="{{ file.display }}">
                                 {{ file.display }}
                             </a>
                         {% endfor %}
                     </div>
+                    {% if totals and totals.csv > output_files.csv|length %}
+                        <button type="button" class="load-more" data-section="csv" data-target="csv-files">Show more CSV reports ({{ totals.csv }} in total)</button>
+                    {% endif %}
                 {% endif %}
                 {% if output_files.html or (output_format == 'all' and output_files.html) %}
                     <h4>HTML Reports</h4>
-                    <div class="download-buttons">
+                    <div class="download-buttons" id="html-files">
                         {% for file in output_files.html %}
-                            <a href="{{ url_for('download_file', filename=file.filename) }}" class="download-button" title="{{ file.display }}">
+                            <a href="{{ url_for('download_file', job_id=job_id, filename=file.filename) }}" class="download-button" title="{{ file.display }}">
                                 {{ file.display }}
                             </a>
                         {% endfor %}
                     </div>
+                    {% if totals and totals.html > output_files.html|length %}
+                        <button type="button" class="load-more" data-section="html" data-target="html-files">Show more HTML reports ({{ totals.html }} in total)</button>
+                    {% endif %}
+                {% endif %}
+                {% if job_id %}
+                    <h4>All Reports</h4>
+                    <div class="download-buttons">
+                        <a href="{{ url_for('download_bundle', job_id=job_id) }}" class="download-button" title="Every report of this run in one ZIP file">
+                            Download All (ZIP)
+                        </a>
+                    </div>
                 {% endif %}
             </div>
         {% endif %}
@@ -1787,6 +4458,59 @@ if __name__ == '__main__':
             © 2025 Employee Log Extractor | Developed by Mir Abdul Aziz Khan
         </footer>
     </div>
+    {% if totals %}
+    <script>
+        const resultsApi = {{ url_for('job_results_api', job_id=job_id)|tojson }};
+        const downloadUrl = {{ url_for('download_file', job_id=job_id, filename='__file__')|tojson }};
+        
+        function logLine(message) {
+            const line = document.createElement('div');
+            line.className = 'log-line';
+            if (message.includes('✅')) line.classList.add('success-line');
+            if (message.includes('❌')) line.classList.add('error-line');
+            if (message.includes('[⚠️]') || message.includes('[!]')) line.classList.add('warning-line');
+            line.textContent = message;
+            return line;
+        }
+        
+        function downloadLink(file) {
+            const link = document.createElement('a');
+            link.href = downloadUrl.replace('__file__', encodeURIComponent(file.filename));
+            link.className = 'download-button';
+            link.title = file.display;
+            link.textContent = file.display;
+            return link;
+        }
+        
+        document.querySelectorAll('.load-more').forEach(button => {
+            button.addEventListener('click', () => {
+                const section = button.dataset.section;
+                const target = document.getElementById(button.dataset.target);
+                const offset = target.children.length;
+                button.disabled = true;
+                fetch(`${resultsApi}?section=${section}&offset=${offset}`)
+                .then(response => response.json())
+                .then(page => {
+                    if (!page.success) {
+                        throw new Error(page.message);
+                    }
+                    page.items.forEach(item => {
+                        target.appendChild(section === 'logs' ? logLine(item) : downloadLink(item));
+                    });
+                    if (offset + page.items.length >= page.total) {
+                        button.remove();
+                    } else {
+                        button.disabled = false;
+                    }
+                })
+                .catch(error => {
+                    console.error('Fetch error:', error);
+                    button.disabled = false;
+                });
+            });
+        });
+    </script>
+    {% endif %}
 </body>
 </html>
 """
@@ -0,0 +1,137 @@
+"""
+Synthetic AEBAS attendance exports, laid out like the files in "sample csv files".
+
+Every employee block is an Att-ID header row, the column row and one row per day of
+the month; rows are fully quoted and end in CRLF, the last line without one. With a
+dirty rate, that share of the day rows is damaged the way real exports are (missing
+cells, unparsable times, unknown statuses, repeated days) and blank lines appear
+between some blocks.
+
+    python benchmarks/generate_aebas.py --employees 2000 --months 2025-01 2025-02 --output /tmp/aebas
+"""
+import argparse
+import calendar
+import csv
+import io
+import os
+import random
+from datetime import datetime, timedelta
+
+NBSP = '\u00a0'
+COLUMN_ROW = ["Sno", "Date", "Status", "In Time", "Out Time", "In Time_Short Fall", "Out Time_Short Fall", "Duration"]
+FIRST_NAMES = ['Abdul', 'Arjumand', 'Mohammed', 'Syed', 'Fatima', 'Ayesha', 'Shaikh', 'Panga', 'Zainab', 'Imran',
+               'Sana', 'Rahul', 'Priya', 'Vijaya', 'Kiran', 'Anand', 'José', 'Renée', 'Müller', 'Nuñez']
+LAST_NAMES = ['Rafeek', 'Nausheen', 'Nasarullah Shah', 'Wasim Akram', 'Ahmed', 'Begum', 'Khan', 'Rekha',
+              'Shanmuka Nagaraju', 'Reddy', 'Siddiqui', 'Hussain', 'Fatima', 'Rao', 'Ali', 'Quadri']
+DESIGNATIONS = ['Senior Resident Ng', 'Junior Resident Ng', 'Assistant Professor', 'Staff Nurse', 'Technician']
+ENCODINGS = ['utf-8', 'utf-8-sig', 'cp1252', 'latin1']
+SHIFT_START = timedelta(hours=9, minutes=10)
+SHIFT_END = timedelta(hours=15)
+
+def initials(number):
+    """A, B, ..., Z, AA, AB, ... for 0, 1, 2, ..."""
+    letters = ''
+    number += 1
+    while number:
+        number, remainder = divmod(number - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+def make_roster(count, rng):
+    """(name, att_id, designation) of count employees with distinct Att-IDs and names.
+
+    The app's roster dedupes by name, so a repeated first/last pair gets initials added.
+    """
+    att_ids = rng.sample(range(10_000_000, 100_000_000), count)
+    seen = {}
+    roster = []
+    for att_id in att_ids:
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        repeats = seen.get((first, last), 0)
+        seen[(first, last)] = repeats + 1
+        name = f"{first} {initials(repeats - 1)} {last}" if repeats else f"{first} {last}"
+        roster.append((name, str(att_id), rng.choice(DESIGNATIONS)))
+    return roster
+
+def clock(delta):
+    seconds = int(delta.total_seconds())
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def day_row(sno, day, rng):
+    date_text = f"{day.strftime('%B')} {day.day}, {day.year}"
+    if day.weekday() == 6:
+        return [str(sno), date_text, 'H', '', '', NBSP, NBSP, NBSP]
+    roll = rng.random()
+    if roll < 0.05:
+        return [str(sno), date_text, 'A', '', '', NBSP, NBSP, NBSP]
+    if roll < 0.07:
+        return [str(sno), date_text, 'L', '', '', NBSP, NBSP, NBSP]
+    in_time = timedelta(hours=9, seconds=rng.randint(0, 3 * 3600))
+    in_short = clock(in_time - SHIFT_START) if in_time > SHIFT_START else NBSP
+    in_text = f"{day:%Y-%m-%d} {clock(in_time)}"
+    if rng.random() < 0.2:
+        # Missing out punch
+        return [str(sno), date_text, 'P', in_text, '0000-00-00 00:00:00', in_short, clock(SHIFT_END), NBSP]
+    out_time = min(in_time + timedelta(seconds=rng.randint(3 * 3600, 12 * 3600)), timedelta(hours=23, minutes=59))
+    out_short = clock(SHIFT_END - out_time) if out_time < SHIFT_END else NBSP
+    return [str(sno), date_text, 'P', in_text, f"{day:%Y-%m-%d} {clock(out_time)}", in_short, out_short,
+            clock(out_time - in_time)]
+
+def dirty_rows(row, rng):
+    """The rows written instead of row when it is damaged."""
+    damage = rng.choice(['short', 'time', 'status', 'repeat'])
+    if damage == 'short':
+        return [row[:-1]]
+    if damage == 'time':
+        return [row[:3] + ['NA', '--:--'] + row[5:]]
+    if damage == 'status':
+        return [row[:2] + [rng.choice(['WO', '', '?'])] + row[3:]]
+    return [row, row]
+
+def generate_export(path, roster, year, month, encoding='utf-8', dirty_rate=0.0, rng=None):
+    """Write the export of one month for every employee of roster to path."""
+    rng = rng or random.Random(0)
+    days = [datetime(year, month, day) for day in range(1, calendar.monthrange(year, month)[1] + 1)]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_ALL, lineterminator='\r\n')
+    for position, (name, att_id, designation) in enumerate(roster):
+        if position and rng.random() < dirty_rate:
+            buffer.write('\r\n')
+        writer.writerow([f"{name}{NBSP * 4}Att-ID:{att_id}{NBSP * 4}Designation:{designation}"])
+        writer.writerow(COLUMN_ROW)
+        for sno, day in enumerate(days, start=1):
+            row = day_row(sno, day, rng)
+            writer.writerows(dirty_rows(row, rng) if rng.random() < dirty_rate else [row])
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        f.write(buffer.getvalue()[:-2])  # No line break after the last row
+    return path
+
+def generate_exports(folder, employees=100, months=((2025, 1),), encoding='utf-8', dirty_rate=0.0, seed=0):
+    """One export per (year, month) for the same roster of employees; returns the file paths."""
+    rng = random.Random(seed)
+    roster = make_roster(employees, rng)
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for year, month in months:
+        path = os.path.join(folder, f"{calendar.month_abbr[month].upper()}_{year}.csv")
+        paths.append(generate_export(path, roster, year, month, encoding, dirty_rate, rng))
+    return paths
+
+def parse_month(text):
+    year, month = text.split('-')
+    return int(year), int(month)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic AEBAS attendance exports.")
+    parser.add_argument('--employees', type=int, default=100)
+    parser.add_argument('--months', nargs='+', type=parse_month, default=[(2025, 1)], metavar='YYYY-MM')
+    parser.add_argument('--encoding', choices=ENCODINGS, default='utf-8')
+    parser.add_argument('--dirty-rate', type=float, default=0.0, help="share of damaged day rows, 0 to 1")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='generated')
+    args = parser.parse_args()
+    for path in generate_exports(args.output, args.employees, args.months, args.encoding, args.dirty_rate, args.seed):
+        print(f"{path} ({os.path.getsize(path)} bytes)")
+
+if __name__ == '__main__':
+    main()
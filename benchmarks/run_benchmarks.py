@@ -0,0 +1,260 @@
+"""
+Benchmarks of the ingest, extraction and report paths of app.py on generated exports.
+
+Each case runs --repeat times, "cold" after every in-memory and on-disk cache of the app
+has been cleared, "warm" with the caches a first run left behind. Results are written as
+JSON (one entry per case with every run, min, median and mean in seconds), so that two
+runs can be compared with --compare.
+
+    python benchmarks/run_benchmarks.py --employees 1000 --months 2025-01 2025-02 --output before.json
+    python benchmarks/run_benchmarks.py --employees 1000 --months 2025-01 2025-02 --compare before.json
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_aebas import ENCODINGS, generate_exports, parse_month
+
+FORMATS = ['xlsx', 'csv', 'html', 'all']
+CACHE_FOLDERS = ['INDEX_FOLDER', 'ARTIFACT_FOLDER', 'COLUMNAR_FOLDER']
+
+def use_folders(app_module, root):
+    """Point every folder of the app below root, so benchmarks never touch real caches or uploads."""
+    for key in ['OUTPUT_FOLDER', 'WORKSPACE_FOLDER'] + CACHE_FOLDERS:
+        app_module.app.config[key] = os.path.join(root, key.split('_')[0].lower())
+        os.makedirs(app_module.app.config[key], exist_ok=True)
+    app_module.app.config['UPLOAD_FOLDER'] = root
+
+def clear_caches(app_module):
+    for cache in (app_module.BLOCK_INDEX_CACHE, app_module.FILE_HASH_CACHE, app_module.ENCODING_CACHE,
+                  app_module.COLUMNAR_CACHE, app_module.EMPLOYEE_INDEXES):
+        cache.clear()
+    for key in CACHE_FOLDERS:
+        folder = app_module.app.config[key]
+        shutil.rmtree(folder, ignore_errors=True)
+        os.makedirs(folder, exist_ok=True)
+
+def measure(name, func, repeat, app_module, cold, results):
+    """Time func repeat times and record the runs under name."""
+    runs = []
+    if not cold:
+        func()  # Fill the caches
+    for _ in range(repeat):
+        if cold:
+            clear_caches(app_module)
+        started = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - started)
+    results[name] = {
+        'runs': [round(run, 6) for run in runs],
+        'min': round(min(runs), 6),
+        'median': round(statistics.median(runs), 6),
+        'mean': round(statistics.mean(runs), 6),
+    }
+    print(f"{name:<50} median {results[name]['median']:.4f}s  min {results[name]['min']:.4f}s")
+
+def wait_for_job(client, status_url):
+    while True:
+        job = client.get(status_url).get_json()
+        if job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.01)
+
+def check_streaming_index(app_module, file_path, folder):
+    """Assert that the upload-time index builder and build_block_index agree around multiples of the encoding sample."""
+    sample_size = app_module.app.config['ENCODING_SAMPLE_BYTES']
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    for multiple in (1, 2, 3):
+        for delta in (-1, 0, 1, sample_size // 2):
+            size = multiple * sample_size + delta
+            data = bytearray((content * (size // len(content) + 1))[:size])
+            if size > sample_size + 1:
+                # A cp1252 byte at the start of the tail sample, where only a correct tail finds it
+                data[max(size - sample_size, sample_size) + 1] = 0xE9
+            path = os.path.join(folder, f'sample_{size}.csv')
+            with open(path, 'wb') as f:
+                f.write(data)
+            app_module.ENCODING_CACHE.clear()
+            builder = app_module.BlockIndexBuilder()
+            for start in range(0, size, 8192):
+                builder.feed(bytes(data[start:start + 8192]))
+            streamed = builder.finish(path)
+            app_module.ENCODING_CACHE.clear()
+            built = app_module.build_block_index(path, streamed['hash'])
+            assert streamed == built, (size, streamed['encoding'], built['encoding'])
+    app_module.ENCODING_CACHE.clear()
+
+def check_report_names(app_module, file_paths, identifiers, output_folder):
+    """Assert that by-ID and all-employees runs name reports alike, whichever fills the artifact cache first."""
+    outcomes = []
+    for order in ((identifiers, None), (None, identifiers)):
+        clear_caches(app_module)
+        for selection in order:
+            _, output_files, display_names, _, _ = app_module.extract_employee_logs(
+                file_paths, selection, 'id', 'all', 'IT', output_folder=output_folder)
+            displays = [display_names[identifier] for identifier in identifiers]
+            entries = sorted((entry['filename'], entry['display']) for entry in output_files['csv'] + output_files['html']
+                             if entry['display'] in displays)
+            outcomes.append((displays, entries))
+    assert all(outcome == outcomes[0] for outcome in outcomes), outcomes
+    clear_caches(app_module)
+
+def benchmark_routes(app_module, file_paths, identifiers, repeat, results):
+    """Time the upload, search, process and download routes through the Flask test client."""
+    client = app_module.app.test_client()
+    client.get('/')
+    contents = [(os.path.basename(path), open(path, 'rb').read()) for path in file_paths]
+
+    def upload():
+        client.get('/')  # Clears the workspace uploads
+        response = client.post('/upload_files', content_type='multipart/form-data', data={
+            'department': app_module.DEPARTMENTS[0],
+            'csv_files': [(io.BytesIO(content), name) for name, content in contents],
+        })
+        assert response.get_json()['success'], response.get_json()
+
+    def search():
+        for query in ['a', 'kh', 'rafeek', identifiers[0][:4]]:
+            client.get(f'/employees?q={query}')
+
+    def process(output_format):
+        def run():
+            response = client.post('/process', data={
+                'search_by': 'id',
+                'identifiers': identifiers,
+                'output_format': output_format,
+                'department': app_module.DEPARTMENTS[0],
+            }).get_json()
+            job = wait_for_job(client, response['status_url'])
+            assert job['status'] == 'done', job
+            run.job_id = response['job_id']
+        return run
+
+    measure('route upload_files (cold)', upload, repeat, app_module, True, results)
+    measure('route employees search (warm)', search, repeat, app_module, False, results)
+    for output_format in FORMATS:
+        measure(f'route process {output_format} (cold)', process(output_format), repeat, app_module, True, results)
+    run = process('all')
+    measure('route process all (warm)', run, repeat, app_module, False, results)
+    summary = client.get(f'/api/results/{run.job_id}').get_json()
+
+    def download(url):
+        def run():
+            response = client.get(url)
+            assert response.status_code == 200, (url, response.status_code)
+            response.get_data()
+        return run
+
+    measure('route download xlsx (warm)', download(f"/download/{run.job_id}/{summary['xlsx']['filename']}"),
+            repeat, app_module, False, results)
+    measure('route download_bundle (warm)', download(f'/download_bundle/{run.job_id}'),
+            repeat, app_module, False, results)
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(previous_path, results):
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = json.load(f)['results']
+    print(f"\n{'case':<50} {'before':>10} {'after':>10} {'ratio':>8}")
+    for name, result in results.items():
+        if name in previous:
+            before = previous[name]['median']
+            ratio = result['median'] / before if before else float('inf')
+            print(f"{name:<50} {before:>9.4f}s {result['median']:>9.4f}s {ratio:>7.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the log extractor on generated AEBAS exports.")
+    parser.add_argument('--employees', type=int, default=500)
+    parser.add_argument('--months', nargs='+', type=parse_month, default=[(2025, 1), (2025, 2), (2025, 3)],
+                        metavar='YYYY-MM')
+    parser.add_argument('--encoding', choices=ENCODINGS, default='utf-8')
+    parser.add_argument('--dirty-rate', type=float, default=0.01)
+    parser.add_argument('--selection', type=int, default=50, help="employees selected for extraction")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip-routes', action='store_true')
+    parser.add_argument('--output', help="JSON file for the results, benchmarks/results/<timestamp>.json by default")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    import app as app_module
+
+    root = tempfile.mkdtemp(prefix='aebas-bench-')
+    try:
+        use_folders(app_module, root)
+        file_paths = generate_exports(os.path.join(root, 'exports'), args.employees, args.months, args.encoding,
+                                      args.dirty_rate, args.seed)
+        roster = app_module.extract_employees_from_csv(file_paths)
+        identifiers = [employee['id'] for employee in roster[:args.selection]]
+        output_folder = app_module.app.config['OUTPUT_FOLDER']
+        results = {}
+        check_streaming_index(app_module, file_paths[0], root)
+        check_report_names(app_module, file_paths, identifiers, output_folder)
+
+        measure('read_csv_safely (cold)', lambda: [app_module.read_csv_safely(path) for path in file_paths],
+                args.repeat, app_module, True, results)
+        for cold in (True, False):
+            label = 'cold' if cold else 'warm'
+            measure(f'extract_employees_from_csv ({label})', lambda: app_module.extract_employees_from_csv(file_paths),
+                    args.repeat, app_module, cold, results)
+            for output_format in FORMATS:
+                measure(f'extract_employee_logs {output_format} ({label})',
+                        lambda: app_module.extract_employee_logs(file_paths, identifiers, 'id', output_format, 'IT',
+                                                                 output_folder=output_folder),
+                        args.repeat, app_module, cold, results)
+        measure('extract_employee_logs all employees xlsx (cold)',
+                lambda: app_module.extract_employee_logs(file_paths, None, 'id', 'xlsx', 'IT', output_folder=output_folder),
+                args.repeat, app_module, True, results)
+        if not args.skip_routes:
+            benchmark_routes(app_module, file_paths, identifiers, args.repeat, results)
+
+        report = {
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'revision': git_revision(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+                'parameters': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+                'dataset': {
+                    'files': len(file_paths),
+                    'bytes': sum(os.path.getsize(path) for path in file_paths),
+                    'employees': len(roster),
+                },
+            },
+            'results': results,
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', f"{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+    if args.compare:
+        compare(args.compare, results)
+
+if __name__ == '__main__':
+    main()